@@ -0,0 +1,98 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from .backends import BACKENDS, DEFAULT_PT_MODEL, DEFAULT_ONNX_MODEL, create_backend, quantize_int8
+
+
+# inference arka uçlarını CPU'da karşılaştır: FPS ve gecikme
+# ros gerekmez, gpu'suz test makinesinde de çalışır
+#   ros2 run nisankiran_telemetry backend_bench --device cpu --int8
+#   ros2 run nisankiran_telemetry backend_bench --image kare.jpg --iters 200
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q)) * 1000.0
+
+
+def bench_backend(backend, frame, iters, warmup, conf_threshold):
+    for _ in range(warmup):
+        backend.detect([frame], conf_threshold)
+
+    samples = []
+    detections = 0
+    start = time.perf_counter()
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        boxes, confs, clss = backend.detect([frame], conf_threshold)[0]
+        samples.append(time.perf_counter() - t0)
+        detections += len(confs)
+    total = time.perf_counter() - start
+
+    return {
+        'fps': iters / total,
+        'mean': float(np.mean(samples)) * 1000.0,
+        'p50': percentile_ms(samples, 50),
+        'p95': percentile_ms(samples, 95),
+        'p99': percentile_ms(samples, 99),
+        'dets': detections / iters,
+    }
+
+
+def load_frame(path, width, height):
+    if path:
+        frame = cv2.imread(path)
+        if frame is None:
+            raise FileNotFoundError(f"Image could not be read: {path}")
+        return frame
+    # görüntü verilmezse gökyüzü benzeri gürültü
+    rng = np.random.default_rng(0)
+    return rng.integers(90, 200, size=(height, width, 3), dtype=np.uint8)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Vision inference backend comparison (CPU by default)')
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--pt-model', default=DEFAULT_PT_MODEL)
+    parser.add_argument('--onnx-model', default=DEFAULT_ONNX_MODEL)
+    parser.add_argument('--int8', action='store_true', help='onnx arka uçlarını int8 modelle de ölç')
+    parser.add_argument('--quantize', action='store_true', help='int8 modeli önce onnx modelden üret')
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--image', default='')
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--iters', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--conf', type=float, default=0.25)
+    opts = parser.parse_args(args)
+
+    if opts.quantize:
+        print(f"INT8 model written: {quantize_int8(opts.onnx_model)}")
+
+    frame = load_frame(opts.image, opts.width, opts.height)
+
+    runs = []
+    for name in opts.backends.split(','):
+        name = name.strip()
+        model_path = opts.pt_model if name == 'ultralytics' else opts.onnx_model
+        runs.append((name, model_path, 'fp32'))
+        if opts.int8 and name != 'ultralytics':
+            runs.append((name, model_path, 'int8'))
+
+    print(f"{'backend':<14}{'prec':<6}{'fps':>8}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'dets':>7}")
+    for name, model_path, precision in runs:
+        try:
+            backend = create_backend(name, model_path, precision, opts.device, opts.imgsz)
+        except Exception as e:
+            print(f"{name:<14}{precision:<6} skipped: {e}")
+            continue
+
+        r = bench_backend(backend, frame, opts.iters, opts.warmup, opts.conf)
+        print(f"{name:<14}{precision:<6}{r['fps']:>8.1f}{r['mean']:>9.2f}{r['p50']:>9.2f}{r['p95']:>9.2f}{r['p99']:>9.2f}{r['dets']:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+import os
+import time
+
+import cv2
+import numpy as np
+
+from .detection import nms, filter_detections, result_to_arrays, empty_detections
+from .image_io import BufferPool
+
+
+# vision nodunun inference arka uçları
+# hepsinin arayüzü aynı: detect(images, conf_threshold, classes, imgsz) -> her kare için (boxes xyxy, confs, clss)
+# imgsz verilirse o çağrı için giriş boyu (küçük arama penceresi için), sabit girişli onnx modellerde yok sayılır
+# ultralytics torch yolu, onnxruntime CPU ve targeter.cpp'deki gibi opencv dnn seçilebilir
+
+DEFAULT_PT_MODEL = '/home/federstation/nisankiran_ws/best.pt'
+DEFAULT_ONNX_MODEL = '/home/federstation/nisankiran_ws/best.onnx'
+
+BACKENDS = ('ultralytics', 'onnxruntime', 'opencv')
+
+
+# int8 modelin yolu: best.onnx -> best_int8.onnx
+def int8_path(model_path):
+    stem, ext = os.path.splitext(model_path)
+    return f"{stem}_int8{ext}"
+
+
+# onnxruntime ile dinamik int8 quantize, kalibrasyon verisi istemez
+def quantize_int8(model_path, out_path=None):
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    out_path = out_path or int8_path(model_path)
+    quantize_dynamic(model_path, out_path, weight_type=QuantType.QInt8)
+    return out_path
+
+
+def create_backend(name, model_path='', precision='fp32', device='', imgsz=640):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}', choose one of {BACKENDS}")
+
+    if name == 'ultralytics':
+        return UltralyticsBackend(model_path or DEFAULT_PT_MODEL, device, imgsz)
+
+    model_path = model_path or DEFAULT_ONNX_MODEL
+    if precision == 'int8':
+        model_path = int8_path(model_path)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"INT8 model not found: {model_path} (backend_bench --quantize ile üretilebilir)")
+
+    if name == 'onnxruntime':
+        return OnnxRuntimeBackend(model_path, device, imgsz)
+    return OpenCVDnnBackend(model_path, device, imgsz)
+
+
+
+# ortak taban: stats verilirse preprocess / inference / postprocess süreleri oraya yazılır
+class InferenceBackend:
+    stats = None
+
+    def record(self, stage, seconds):
+        if self.stats is not None:
+            self.stats.record(stage, seconds)
+
+    # ilk çağrılardaki tembel başlatma (CUDA context, cudnn algoritma seçimi, onnx bellek ayırma) uçuşta değil açılışta olsun
+    # shapes: (kareler, imgsz) listesi, sıcak yolda görülecek batch ve giriş boyları. ısınma süreleri stats'a yazılmaz
+    # kareler: batch'teki her görüntünün (h, w) boyu. letterbox dikdörtgen giriş üretebilir (1280x720 -> 384x640),
+    # gerçek kare boyuyla ısıtılmazsa ilk gerçek karede o giriş boyu için tembel başlatma yine ödenir
+    # kareler sayı verilirse o kadar imgsz x imgsz kare
+    def warmup(self, iters=3, shapes=((1, None),)):
+        stats, self.stats = self.stats, None
+        try:
+            for sizes, imgsz in shapes:
+                if isinstance(sizes, int):
+                    size = imgsz or self.imgsz
+                    sizes = [(size, size)] * sizes
+                frames = [np.zeros((h, w, 3), dtype=np.uint8) for h, w in sizes]
+                for _ in range(iters):
+                    self.detect(frames, 1.0, None, imgsz)
+        finally:
+            self.stats = stats
+
+
+
+# ultralytics / torch---------
+class UltralyticsBackend(InferenceBackend):
+    def __init__(self, model_path, device='', imgsz=640):
+        from ultralytics import YOLO
+
+        self.name = 'ultralytics'
+        self.model_path = model_path
+        self.model = YOLO(model_path)
+        self.device = device or None
+        self.imgsz = imgsz
+
+    def detect(self, images, conf_threshold, classes=None, imgsz=None):
+        # eşik ve sınıf modele verilmezse ultralytics kendi varsayılanıyla (conf=0.25) eler, düşük eşik hiç uygulanmaz
+        results = self.model(images, conf=conf_threshold, classes=classes, verbose=False, device=self.device, imgsz=imgsz or self.imgsz)
+
+        # filtre yine de tekrar edilir, diğer backend'lerle aynı kutular çıksın
+        t0 = time.perf_counter()
+        detections = [filter_detections(*result_to_arrays(r), conf_threshold, classes) for r in results]
+        filter_time = time.perf_counter() - t0
+
+        # ultralytics kendi aşama sürelerini ms olarak veriyor
+        speed = {stage: sum(r.speed.get(stage, 0.0) for r in results) / 1000.0 for stage in ('preprocess', 'inference', 'postprocess')}
+        self.record('preprocess', speed['preprocess'])
+        self.record('inference', speed['inference'])
+        self.record('postprocess', speed['postprocess'] + filter_time)
+        return detections
+# ultralytics / torch---------/
+
+
+
+# onnx modeller için ortak ön/son işlem---------
+class _OnnxYoloBackend(InferenceBackend):
+    def __init__(self, imgsz=640):
+        self.imgsz = imgsz
+        self.iou_threshold = 0.45
+        self.dynamic_size = False # model farklı giriş boylarını kabul ediyor mu
+        self.buffers = BufferPool() # letterbox ve blob her karede yeniden ayrılmasın
+
+    def input_size(self, imgsz):
+        return imgsz if (imgsz and self.dynamic_size) else self.imgsz
+
+    # oranı koruyarak size x size kareye oturt, kenarları gri doldur
+    def letterbox(self, image, size):
+        h, w = image.shape[:2]
+        scale = min(size / w, size / h)
+        nw, nh = int(round(w * scale)), int(round(h * scale))
+        pad_x, pad_y = (size - nw) // 2, (size - nh) // 2
+
+        canvas = self.buffers.get('canvas', (size, size, 3))
+        canvas.fill(114)
+        resized = self.buffers.get('resized', (nh, nw, 3))
+        cv2.resize(image, (nw, nh), dst=resized, interpolation=cv2.INTER_LINEAR)
+        canvas[pad_y:pad_y + nh, pad_x:pad_x + nw] = resized
+        return canvas, scale, pad_x, pad_y
+
+    # NCHW float32 RGB 0-1, blob buffer'ı kareler arası yeniden kullanılır
+    def preprocess(self, images, imgsz=None):
+        size = self.input_size(imgsz)
+        blob = self.buffers.get('blob', (len(images), 3, size, size), np.float32)
+        metas = []
+        for i, image in enumerate(images):
+            canvas, scale, pad_x, pad_y = self.letterbox(image, size)
+            # BGR->RGB ve HWC->CHW aynı anda, 1/255 ile blob'a yaz
+            np.multiply(canvas[:, :, ::-1].transpose(2, 0, 1), np.float32(1.0 / 255.0), out=blob[i])
+            metas.append((scale, pad_x, pad_y, image.shape[1], image.shape[0]))
+        return blob, metas
+
+    # YOLOv8/11 çıktısı: (4 + sınıf sayısı) x 8400, gerekirse transpoz
+    def postprocess(self, out, meta, conf_threshold, classes=None):
+        if out.shape[0] < out.shape[1]:
+            out = out.T
+
+        scores = out[:, 4:]
+        clss = scores.argmax(axis=1)
+        confs = scores[np.arange(len(scores)), clss]
+
+        mask = confs > conf_threshold
+        if classes is not None:
+            mask &= np.isin(clss, classes)
+        if not mask.any():
+            return empty_detections()
+
+        xywh, confs, clss = out[mask, :4], confs[mask], clss[mask]
+
+        scale, pad_x, pad_y, w, h = meta
+        boxes = np.empty_like(xywh)
+        boxes[:, 0] = (xywh[:, 0] - xywh[:, 2] / 2 - pad_x) / scale
+        boxes[:, 1] = (xywh[:, 1] - xywh[:, 3] / 2 - pad_y) / scale
+        boxes[:, 2] = (xywh[:, 0] + xywh[:, 2] / 2 - pad_x) / scale
+        boxes[:, 3] = (xywh[:, 1] + xywh[:, 3] / 2 - pad_y) / scale
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h)
+
+        keep = nms(boxes, confs, self.iou_threshold)
+        return boxes[keep], confs[keep], clss[keep]
+# onnx modeller için ortak ön/son işlem---------/
+
+
+
+# onnxruntime---------
+class OnnxRuntimeBackend(_OnnxYoloBackend):
+    def __init__(self, model_path, device='', imgsz=640):
+        super().__init__(imgsz)
+        import onnxruntime as ort
+
+        self.name = 'onnxruntime'
+        self.model_path = model_path
+
+        providers = ['CPUExecutionProvider']
+        if device.startswith('cuda') and 'CUDAExecutionProvider' in ort.get_available_providers():
+            providers.insert(0, 'CUDAExecutionProvider')
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, sess_options=opts, providers=providers)
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # batch boyutu sabit 1 ile export edildiyse kareleri tek tek ver
+        self.dynamic_batch = not isinstance(model_input.shape[0], int)
+        self.dynamic_size = not isinstance(model_input.shape[2], int)
+
+    def detect(self, images, conf_threshold, classes=None, imgsz=None):
+        t0 = time.perf_counter()
+        blob, metas = self.preprocess(images, imgsz)
+        t1 = time.perf_counter()
+
+        if self.dynamic_batch:
+            outputs = self.session.run(None, {self.input_name: blob})[0]
+        else:
+            outputs = np.concatenate([self.session.run(None, {self.input_name: blob[i:i + 1]})[0] for i in range(len(images))])
+        t2 = time.perf_counter()
+
+        detections = [self.postprocess(out, meta, conf_threshold, classes) for out, meta in zip(outputs, metas)]
+        t3 = time.perf_counter()
+
+        self.record('preprocess', t1 - t0)
+        self.record('inference', t2 - t1)
+        self.record('postprocess', t3 - t2)
+        return detections
+# onnxruntime---------/
+
+
+
+# opencv dnn (targeter.cpp ile aynı yol)---------
+class OpenCVDnnBackend(_OnnxYoloBackend):
+    def __init__(self, model_path, device='', imgsz=640):
+        super().__init__(imgsz)
+
+        self.name = 'opencv'
+        self.model_path = model_path
+        self.net = cv2.dnn.readNetFromONNX(model_path)
+
+        if device.startswith('cuda'):
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+        else:
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+    def detect(self, images, conf_threshold, classes=None, imgsz=None):
+        t0 = time.perf_counter()
+        blob, metas = self.preprocess(images, imgsz)
+        self.record('preprocess', time.perf_counter() - t0)
+
+        detections = []
+        infer_time = post_time = 0.0
+        for i, meta in enumerate(metas):
+            t1 = time.perf_counter()
+            self.net.setInput(blob[i:i + 1])
+            out = self.net.forward()[0]
+            t2 = time.perf_counter()
+            detections.append(self.postprocess(out, meta, conf_threshold, classes))
+            infer_time += t2 - t1
+            post_time += time.perf_counter() - t2
+
+        self.record('inference', infer_time)
+        self.record('postprocess', post_time)
+        return detections
+# opencv dnn---------/
@@ -0,0 +1,80 @@
+import numpy as np
+
+
+# görüntü düzleminde sabit hızlı Kalman filtresi, durum: (cx, cy, w, h) ve hızları, piksel ve saniye
+# tespit 10 Hz gelse de guidance'a sabit hızda tahmin basabilmek için
+# model sabit hız + beyaz gürültülü ivme, eksenler birbirinden bağımsız: 4 tane 2x2 filtre vektör halinde
+class BboxKalman:
+    def __init__(self, accel_std=150.0, meas_std=4.0, init_vel_std=200.0, gate_sigma=6.0):
+        self.q = accel_std ** 2          # ivme gürültüsü (px/s^2)^2
+        self.r = meas_std ** 2           # tespit gürültüsü px^2
+        self.init_vel_var = init_vel_std ** 2
+        self.gate_sigma = gate_sigma     # merkez bu kadar sigmadan fazla sıçrarsa başka hedef say, yeniden başlat
+
+        self.pos = np.zeros(4)
+        self.vel = np.zeros(4)
+        self.p00 = np.zeros(4) # konum varyansı
+        self.p01 = np.zeros(4) # konum-hız kovaryansı
+        self.p11 = np.zeros(4) # hız varyansı
+        self.t = None          # son güncellemenin zamanı
+
+    @property
+    def active(self):
+        return self.t is not None
+
+    def reset(self):
+        self.t = None
+
+    def init(self, t, z):
+        self.pos[:] = z
+        self.vel[:] = 0.0
+        self.p00[:] = self.r
+        self.p01[:] = 0.0
+        self.p11[:] = self.init_vel_var
+        self.t = t
+
+    # dt kadar ileri taşınmış (konum, hız, p00, p01, p11), durumu değiştirmez
+    def _propagate(self, dt):
+        q = self.q
+        pos = self.pos + self.vel * dt
+        p00 = self.p00 + dt * (2.0 * self.p01 + dt * self.p11) + q * dt ** 4 / 4.0
+        p01 = self.p01 + dt * self.p11 + q * dt ** 3 / 2.0
+        p11 = self.p11 + q * dt ** 2
+        return pos, self.vel, p00, p01, p11
+
+    # z: (cx, cy, w, h) ölçümü, t: karenin zaman damgası (saniye)
+    def update(self, t, z):
+        z = np.asarray(z, dtype=float)
+        if self.t is None:
+            self.init(t, z)
+            return
+
+        pos, vel, p00, p01, p11 = self._propagate(max(t - self.t, 0.0))
+        s = p00 + self.r
+        y = z - pos
+
+        # merkez kapının dışında: hedef değişti ya da takip koptu
+        if np.any(np.abs(y[:2]) > self.gate_sigma * np.sqrt(s[:2])):
+            self.init(t, z)
+            return
+
+        k0 = p00 / s
+        k1 = p01 / s
+        self.pos = pos + k0 * y
+        self.vel = vel + k1 * y
+        self.p00 = (1.0 - k0) * p00
+        self.p01 = (1.0 - k0) * p01
+        self.p11 = p11 - k1 * p01
+        self.t = t
+
+    # t anındaki tahmin: ((cx, cy, w, h), her birinin standart sapması), aktif değilse None
+    def predict(self, t):
+        if self.t is None:
+            return None
+        pos, _, p00, _, _ = self._propagate(max(t - self.t, 0.0))
+        pos[2:] = np.maximum(pos[2:], 0.0)
+        return pos, np.sqrt(p00)
+
+    # son ölçümden beri geçen süre
+    def age(self, t):
+        return max(t - self.t, 0.0) if self.t is not None else None
@@ -0,0 +1,101 @@
+import cv2
+import numpy as np
+
+
+# iki tespit arasında kutuyu seyrek optik akışla (Lucas-Kanade) taşıyan hafif takipçi
+# opencv-contrib gerektirmez, kutu başına birkaç düzine nokta izlenir
+class FlowTracker:
+    def __init__(self, max_points=40, min_points=6, fb_threshold=1.5):
+        self.max_points = max_points
+        self.min_points = min_points
+        self.fb_threshold = fb_threshold # ileri-geri hata eşiği (piksel)
+
+        self.lk_params = dict(winSize=(15, 15), maxLevel=2,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+        self.prev_gray = None
+        self.points = None
+        self.bbox = None # (x1, y1, x2, y2) float
+
+    @property
+    def active(self):
+        return self.bbox is not None
+
+    def reset(self):
+        self.prev_gray = None
+        self.points = None
+        self.bbox = None
+
+    # yeni tespitle başlat, kutuda yeterli köşe yoksa takipçi pasif kalır
+    def init(self, gray, bbox):
+        self.prev_gray = gray
+        self.bbox = tuple(float(v) for v in bbox)
+        self.points = self._seed_points(gray, self.bbox)
+        if self.points is None:
+            self.reset()
+        return self.active
+
+    def _seed_points(self, gray, bbox):
+        h, w = gray.shape[:2]
+        x1, y1, x2, y2 = bbox
+        # küçük hedefte kenardaki gökyüzü de işe yarar, kutuyu biraz büyüt
+        pad_x, pad_y = max(2.0, (x2 - x1) * 0.1), max(2.0, (y2 - y1) * 0.1)
+        x1, y1 = int(max(0, x1 - pad_x)), int(max(0, y1 - pad_y))
+        x2, y2 = int(min(w, x2 + pad_x)), int(min(h, y2 + pad_y))
+        if x2 - x1 < 4 or y2 - y1 < 4:
+            return None
+
+        pts = cv2.goodFeaturesToTrack(gray[y1:y2, x1:x2], self.max_points, 0.01, 2, blockSize=3)
+        if pts is None or len(pts) < self.min_points:
+            return None
+        return (pts + np.array([x1, y1], dtype=np.float32)).astype(np.float32)
+
+    # kutuyu bir kare ilerlet -> (bbox ya da None, güven 0-1)
+    # shift: kamera dönüşünden beklenen (dx, dy), LK aramaya oradan başlar, piramit menzilini aşan sıçramada iz kopmasın
+    def update(self, gray, shift=None):
+        if not self.active:
+            return None, 0.0
+
+        p0 = self.points
+        if shift is None:
+            p1, st, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, p0, None, **self.lk_params)
+            p0r, st_back, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, p1, None, **self.lk_params)
+        else:
+            offset = np.array(shift, dtype=np.float32)
+            p1, st, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, p0, p0 + offset, flags=cv2.OPTFLOW_USE_INITIAL_FLOW, **self.lk_params)
+            p0r, st_back, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, p1, p1 - offset, flags=cv2.OPTFLOW_USE_INITIAL_FLOW, **self.lk_params)
+
+        fb_err = np.linalg.norm((p0 - p0r).reshape(-1, 2), axis=1)
+        good = (st.ravel() == 1) & (st_back.ravel() == 1) & (fb_err < self.fb_threshold)
+
+        n_good = int(good.sum())
+        if n_good < self.min_points:
+            self.reset()
+            return None, 0.0
+
+        old = p0.reshape(-1, 2)[good]
+        new = p1.reshape(-1, 2)[good]
+
+        # öteleme: noktaların medyan kayması, ölçek: merkeze uzaklıkların medyan oranı
+        dx, dy = (float(v) for v in np.median(new - old, axis=0))
+        d_old = np.linalg.norm(old - old.mean(axis=0), axis=1)
+        d_new = np.linalg.norm(new - new.mean(axis=0), axis=1)
+        valid = d_old > 1e-3
+        scale = float(np.median(d_new[valid] / d_old[valid])) if valid.any() else 1.0
+
+        x1, y1, x2, y2 = self.bbox
+        cx, cy = (x1 + x2) / 2.0 + dx, (y1 + y2) / 2.0 + dy
+        hw, hh = (x2 - x1) * scale / 2.0, (y2 - y1) * scale / 2.0
+        self.bbox = (cx - hw, cy - hh, cx + hw, cy + hh)
+
+        confidence = n_good / float(len(p0))
+
+        # nokta sayısı yarıya indiyse kutudan yeniden topla
+        self.points = new.reshape(-1, 1, 2).astype(np.float32)
+        if n_good < self.max_points // 2:
+            seeded = self._seed_points(gray, self.bbox)
+            if seeded is not None:
+                self.points = seeded
+
+        self.prev_gray = gray
+        return self.bbox, confidence
@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from .frame_slot import LatestFrameSlot
+
+
+# kara kutu: son N saniyenin kareleri bellekte jpeg olarak halka bufferda
+# kilit kırılınca ya da vuruş onayında olay öncesi + sonrası pencere ayrı thread'de diske yazılır
+# kamera callback'i sadece mesajı bırakır, çözme/sıkıştırma/yazma hiçbir zaman callback'i bekletmez
+class BlackBoxRecorder:
+    def __init__(self, out_dir, decode, seconds_before=5.0, seconds_after=3.0, max_bytes=64 * 1024 * 1024,
+                 jpeg_quality=80, fps=15.0, name=''):
+        self.out_dir = os.path.expanduser(out_dir)
+        self.decode = decode # msg -> bgr kare, sadece encoder thread'inden çağrılır
+        self.seconds_before = seconds_before
+        self.seconds_after = seconds_after
+        self.max_bytes = max_bytes
+        self.jpeg_quality = jpeg_quality
+        self.min_interval = 1.0 / fps if fps > 0 else 0.0
+        self.name = name
+
+        # (zaman damgası, jpeg bytes), eskiler süre ya da bellek sınırından düşer
+        self.ring = deque()
+        self.ring_bytes = 0
+        self.ring_lock = threading.Lock()
+        self.last_stamp = None
+
+        self.slot = LatestFrameSlot() # encoder yetişemezse kare düşer, kamera beklemez
+        self.events = [] # (olay adı, olay damgası, yazma zamanı monotonic)
+        self.events_cond = threading.Condition()
+        self.running = True
+
+        self.encoder = threading.Thread(target=self._encode_loop, daemon=True)
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.encoder.start()
+        self.writer.start()
+
+    # kamera callback'inden, asla beklemez
+    def submit(self, msg, stamp):
+        self.slot.put((msg, stamp))
+
+    # olay anı: olay sonrası pencere dolunca (seconds_after) diske yazılır
+    def trigger(self, event, stamp):
+        with self.events_cond:
+            self.events.append((event, stamp, time.monotonic() + self.seconds_after))
+            self.events_cond.notify()
+
+    # bekleyen olaylar beklemeden yazılır
+    def stop(self):
+        self.running = False
+        self.slot.close()
+        with self.events_cond:
+            self.events_cond.notify()
+        self.encoder.join(timeout=2.0)
+        self.writer.join(timeout=10.0)
+
+    def memory(self):
+        with self.ring_lock:
+            return len(self.ring), self.ring_bytes
+
+
+    def _encode_loop(self):
+        while not self.slot.closed:
+            item = self.slot.get(timeout=0.5)
+            if item is None:
+                continue
+            msg, stamp = item
+            if self.last_stamp is not None and 0.0 <= stamp - self.last_stamp < self.min_interval:
+                continue
+
+            # kamera zaten jpeg gönderiyorsa tekrar sıkıştırma
+            if 'jpeg' in getattr(msg, 'format', ''):
+                self.last_stamp = stamp
+                self._append(stamp, bytes(msg.data))
+                continue
+
+            frame = self.decode(msg)
+            if frame is None:
+                continue
+            ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                continue
+            self.last_stamp = stamp
+            self._append(stamp, jpeg.tobytes())
+
+    def _append(self, stamp, data):
+        horizon = self.seconds_before + self.seconds_after + 1.0 # yazma thread'i olaydan biraz sonra okur
+        with self.ring_lock:
+            self.ring.append((stamp, data))
+            self.ring_bytes += len(data)
+            while self.ring and (self.ring_bytes > self.max_bytes or stamp - self.ring[0][0] > horizon):
+                self.ring_bytes -= len(self.ring.popleft()[1])
+
+
+    def _write_loop(self):
+        while True:
+            with self.events_cond:
+                while self.running and not self._due():
+                    timeout = min(e[2] for e in self.events) - time.monotonic() if self.events else None
+                    self.events_cond.wait(timeout)
+                if not self.running and not self.events:
+                    return
+                now = time.monotonic()
+                due = [e for e in self.events if e[2] <= now or not self.running]
+                self.events = [e for e in self.events if e not in due]
+
+            for event, stamp, _ in due:
+                self._flush(event, stamp)
+
+    def _due(self):
+        now = time.monotonic()
+        return any(e[2] <= now for e in self.events)
+
+    def _flush(self, event, stamp):
+        with self.ring_lock:
+            frames = [(t, data) for t, data in self.ring if stamp - self.seconds_before <= t <= stamp + self.seconds_after]
+        if not frames:
+            return
+
+        folder = time.strftime('%Y%m%d-%H%M%S') + f"_{self.name + '_' if self.name else ''}{event}"
+        path = os.path.join(self.out_dir, folder)
+        os.makedirs(path, exist_ok=True)
+        for i, (t, data) in enumerate(frames):
+            with open(os.path.join(path, f"{i:05d}_{t - stamp:+.3f}.jpg"), 'wb') as f:
+                f.write(data)
+        with open(os.path.join(path, 'event.txt'), 'w') as f:
+            f.write(f"event: {event}\ncamera: {self.name or 'default'}\nstamp: {stamp:.3f}\nframes: {len(frames)}\n")
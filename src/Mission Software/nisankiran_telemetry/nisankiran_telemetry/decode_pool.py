@@ -0,0 +1,63 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+
+# CompressedImage (jpeg/png) -> bgr kare, sıkıştırılmış veri msg.data üzerine kopyasız view
+def decode_compressed(msg):
+    frame = cv2.imdecode(np.frombuffer(msg.data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    return frame if frame is not None and frame.size else None
+
+
+# sıkıştırılmış kareler küçük bir thread havuzunda çözülür, cv2.imdecode GIL'i bırakıyor
+# hangi kare önce biterse bitsin her kamera için geliş sırasıyla teslim edilir
+# havuz yetişemezse yeni kare düşer, kamera callback'i hiç beklemez
+class OrderedDecodePool:
+    def __init__(self, deliver, workers=2, stats=None, decode=decode_compressed):
+        self.deliver = deliver # deliver(key, msg, frame, received), sırayla ve kilit altında çağrılır, kısa olmalı
+        self.decode = decode
+        self.stats = stats
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='decode')
+        self.max_pending = workers * 2
+
+        self.pending = {} # key -> deque[(msg, received, future)] geliş sırası
+        self.lock = threading.Lock()
+        self.dropped = 0
+        self.failed = 0
+
+    # received: callback'teki alış zamanı, kareyle birlikte teslim edilir
+    def submit(self, key, msg, received=None):
+        with self.lock:
+            queue = self.pending.setdefault(key, deque())
+            if len(queue) >= self.max_pending:
+                self.dropped += 1
+                return
+            future = self.executor.submit(self._decode, msg)
+            queue.append((msg, received, future))
+        future.add_done_callback(lambda _, key=key: self._drain(key))
+
+    def _decode(self, msg):
+        t0 = time.perf_counter()
+        frame = self.decode(msg)
+        if self.stats is not None:
+            self.stats.record('decode', time.perf_counter() - t0)
+        return frame
+
+    # baştaki kareler bittikçe sırayla teslim et, arkadaki bitmiş kare öndekini bekler
+    def _drain(self, key):
+        with self.lock:
+            queue = self.pending[key]
+            while queue and queue[0][2].done():
+                msg, received, future = queue.popleft()
+                frame = None if future.cancelled() or future.exception() else future.result()
+                if frame is None:
+                    self.failed += 1
+                    continue
+                self.deliver(key, msg, frame, received)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,126 @@
+import numpy as np
+
+
+# uzaktaki uçak birkaç piksel kalıyor, tüm kareyi 640'a küçültünce kayboluyor
+# kareyi örtüşen parçalara bölüp tek batch'te modele veriyoruz, kutuları global NMS ile birleştiriyoruz
+
+
+# rows x cols örtüşen parça, (x1, y1, x2, y2) piksel
+def make_tiles(width, height, rows, cols, overlap):
+    rows, cols = max(1, int(rows)), max(1, int(cols))
+    overlap = min(max(float(overlap), 0.0), 0.9)
+
+    # parça boyu: cols parça, aralarında overlap kadar ortak alan
+    tile_w = int(np.ceil(width / (cols - (cols - 1) * overlap)))
+    tile_h = int(np.ceil(height / (rows - (rows - 1) * overlap)))
+
+    xs = np.linspace(0, width - tile_w, cols).astype(int) if cols > 1 else [0]
+    ys = np.linspace(0, height - tile_h, rows).astype(int) if rows > 1 else [0]
+
+    return [(int(x), int(y), int(x) + tile_w, int(y) + tile_h) for y in ys for x in xs]
+
+
+# klasik greedy NMS, boxes Nx4 xyxy
+def nms(boxes, scores, iou_threshold=0.45):
+    if len(boxes) == 0:
+        return np.empty(0, dtype=int)
+
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1).clip(min=0) * (y2 - y1).clip(min=0)
+    order = scores.argsort()[::-1]
+
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+
+        xx1 = np.maximum(x1[i], x1[order[1:]])
+        yy1 = np.maximum(y1[i], y1[order[1:]])
+        xx2 = np.minimum(x2[i], x2[order[1:]])
+        yy2 = np.minimum(y2[i], y2[order[1:]])
+        inter = (xx2 - xx1).clip(min=0) * (yy2 - yy1).clip(min=0)
+        iou = inter / (areas[i] + areas[order[1:]] - inter + 1e-9)
+
+        order = order[1:][iou <= iou_threshold]
+
+    return np.asarray(keep, dtype=int)
+
+
+# iki kutu kümesi arasında IoU matrisi, a Nx4 b Mx4 xyxy -> NxM
+def iou_matrix(a, b):
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)))
+
+    xx1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    yy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    xx2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    yy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = (xx2 - xx1).clip(min=0) * (yy2 - yy1).clip(min=0)
+    area_a = (a[:, 2] - a[:, 0]).clip(min=0) * (a[:, 3] - a[:, 1]).clip(min=0)
+    area_b = (b[:, 2] - b[:, 0]).clip(min=0) * (b[:, 3] - b[:, 1]).clip(min=0)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+# ultralytics sonucu -> numpy (xyxy, conf, cls), kutu kutu değil tek seferde CPU'ya al
+def result_to_arrays(result):
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return empty_detections()
+    data = boxes.data.cpu().numpy() # Nx6: x1 y1 x2 y2 conf cls
+    return data[:, :4], data[:, 4], data[:, 5].astype(int)
+
+
+def empty_detections():
+    return np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.float32), np.empty(0, dtype=int)
+
+
+# eşik ve sınıf filtresi tüm dizi üzerinde, classes None ise tüm sınıflar
+def filter_detections(boxes, confs, clss, conf_threshold, classes=None):
+    mask = confs > conf_threshold
+    if classes is not None:
+        mask &= np.isin(clss, classes)
+    return boxes[mask], confs[mask], clss[mask]
+
+
+# birden fazla karenin/parçanın tespitlerini tek diziye topla
+def concat_detections(parts):
+    parts = [p for p in parts if len(p[1])]
+    if not parts:
+        return empty_detections()
+    if len(parts) == 1:
+        return parts[0]
+    return tuple(np.concatenate(x) for x in zip(*parts))
+
+
+# en güvenilir tespitin indexi, yoksa -1
+def best_index(confs):
+    if len(confs) == 0:
+        return -1
+    return int(np.argmax(confs))
+
+
+# parça kırpıntıları ve ofsetleri
+# büyük hedefler parçalara bölünmesin diye istenirse tam kare de eklenir
+def tile_crops(frame, tiles, include_full=True):
+    crops = [frame[y1:y2, x1:x2] for (x1, y1, x2, y2) in tiles]
+    offsets = [(x1, y1) for (x1, y1, _, _) in tiles]
+    if include_full:
+        crops.append(frame)
+        offsets.append((0, 0))
+    return crops, offsets
+
+
+# parça tespitlerini tam kare koordinatına taşı, global NMS ile birleştir
+def merge_tiles(detections, offsets, iou_threshold=0.45):
+    parts = []
+    for (xyxy, conf, cls), (ox, oy) in zip(detections, offsets):
+        if len(conf):
+            parts.append((xyxy + np.array([ox, oy, ox, oy], dtype=xyxy.dtype), conf, cls))
+
+    boxes, confs, clss = concat_detections(parts)
+    if len(confs) == 0:
+        return boxes, confs, clss
+
+    keep = nms(boxes, confs, iou_threshold)
+    return boxes[keep], confs[keep], clss[keep]
+
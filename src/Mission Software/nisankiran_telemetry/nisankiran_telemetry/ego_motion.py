@@ -0,0 +1,108 @@
+import math
+import threading
+from collections import deque
+
+import numpy as np
+
+from .search_window import quat_to_rot
+
+
+# kendi uçağımız yatış/yunuslama yapınca hedef görüntüde sıçrıyor, takip ve arama penceresi kaçırıyor
+# iki kare arasındaki kamera dönüşünü PX4 duruşundan (ve açısal hızdan) bulup
+# bir önceki kutuyu aramadan/eşleştirmeden önce o dönüş kadar kaydırıyoruz
+# saf dönüş: uzak hedefte kameranın ötelenmesi ihmal edilebilir, piksel eşlemesi sadece dönüşle
+
+
+def quat_mul(a, b):
+    aw, ax, ay, az = a
+    bw, bx, by, bz = b
+    return (
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    )
+
+
+# gövde açısal hızıyla (FRD, rad/s) dt kadar ileri döndür
+def integrate_quat(q, rates, dt):
+    wx, wy, wz = rates
+    angle = math.sqrt(wx * wx + wy * wy + wz * wz) * dt
+    if abs(angle) < 1e-9:
+        return q
+    s = math.sin(angle / 2.0) / (angle / dt)
+    dq = (math.cos(angle / 2.0), wx * s, wy * s, wz * s)
+    w, x, y, z = quat_mul(q, dq)
+    n = math.sqrt(w * w + x * x + y * y + z * z)
+    return (w / n, x / n, y / n, z / n)
+
+
+# NED -> kamera (ileri, sağ, aşağı) dönüşümü, project_ned_to_image ile aynı kamera montajı
+def ned_to_camera(q, cam_pitch_deg=0.0):
+    rot = quat_to_rot(q).T
+    if cam_pitch_deg:
+        p = math.radians(cam_pitch_deg)
+        c, s = math.cos(p), math.sin(p)
+        rot = np.array([[c, 0.0, -s], [0.0, 1.0, 0.0], [s, 0.0, c]]) @ rot
+    return rot
+
+
+# önceki kameradaki ışını şimdiki kameraya taşıyan dönüş
+def camera_rotation(q_prev, q_now, cam_pitch_deg=0.0):
+    return ned_to_camera(q_now, cam_pitch_deg) @ ned_to_camera(q_prev, cam_pitch_deg).T
+
+
+# pikseli dönüşle taşı, kameranın arkasına düştüyse None
+def warp_point(rot, u, v, fx, fy, cx, cy):
+    ray = rot @ np.array([1.0, (u - cx) / fx, (v - cy) / fy])
+    if ray[0] <= 1e-3:
+        return None
+    return cx + fx * ray[1] / ray[0], cy + fy * ray[2] / ray[0]
+
+
+# kutu merkezinin dönüşle kayması (dx, dy), boyut aynı kalır. kameranın arkasına düştüyse None
+def bbox_shift(bbox, rot, fx, fy, cx, cy):
+    x1, y1, x2, y2 = bbox
+    bx, by = (x1 + x2) / 2.0, (y1 + y2) / 2.0
+    moved = warp_point(rot, bx, by, fx, fy, cx, cy)
+    if moved is None:
+        return None
+    return moved[0] - bx, moved[1] - by
+
+
+# duruş geçmişi: kare anındaki duruş en yakın önceki örnekten açısal hızla ileri taşınarak bulunur
+# zamanlar alış anı (monotonic), PX4 saati ile kamera damgası aynı saatte değil
+class EgoMotion:
+    def __init__(self, history_seconds=1.0, max_extrapolation=0.05):
+        self.history_seconds = history_seconds
+        self.max_extrapolation = max_extrapolation # açısal hızla en fazla bu kadar saniye ileri taşı
+        self.attitudes = deque() # (t, q)
+        self.rates = None        # (t, (wx, wy, wz))
+        self.lock = threading.Lock() # ROS callback'leri yazar, inference thread'i okur
+
+    def add_attitude(self, t, q):
+        with self.lock:
+            self.attitudes.append((t, tuple(float(v) for v in q)))
+            while self.attitudes and t - self.attitudes[0][0] > self.history_seconds:
+                self.attitudes.popleft()
+
+    def add_rates(self, t, rates):
+        with self.lock:
+            self.rates = (t, tuple(float(v) for v in rates))
+
+    # t anındaki duruş, veri yoksa None
+    def attitude_at(self, t):
+        with self.lock:
+            if not self.attitudes:
+                return None
+            sample_t, q = self.attitudes[0]
+            for at, aq in self.attitudes:
+                if at > t:
+                    break
+                sample_t, q = at, aq
+            rates = self.rates
+
+        dt = min(max(t - sample_t, -self.max_extrapolation), self.max_extrapolation)
+        if rates is not None and abs(dt) > 1e-4:
+            q = integrate_quat(q, rates[1], dt)
+        return q
@@ -7,6 +7,8 @@ import threading
 import time
 import math
 
+from .topic_discovery import TopicDiscovery, DEFAULT_POSITION_PATTERN
+
 app = Flask(__name__)
 
 #daha sonra düzenleyecem launch a eklenmeyecek
@@ -21,7 +23,7 @@ def get_metrics():
     # normalde x y z değil enlem boylam istenir ama simülasyon xyz'sini basıyoz
     konum_bilgileri = []
     
-    for uav_id, data in FLEET_METRICS.items():
+    for uav_id, data in list(FLEET_METRICS.items()): # ros thread'i aynı anda uçak ekleyip silebilir
         paket = {
             "takim_numarasi": int(uav_id),
             "IHA_enlem": data['x'],     # aslında x koordinatı
@@ -66,34 +68,39 @@ class FakeServerNode(Node):
         )
 
 
-        self.active_subs = set()
-        
-        self.create_timer(2.0, self.update_subscriptions)
+        self.declare_parameter('position_topic_pattern', DEFAULT_POSITION_PATTERN)
+        self.discovery = TopicDiscovery(
+            self,
+            self.get_parameter('position_topic_pattern').value,
+            'px4_msgs/msg/VehicleLocalPosition',
+            self.add_uav,
+            self.remove_uav,
+        )
 
         self.get_logger().info("Gazebo aktarıcı hazırlandı.")
 
 
 
-    def update_subscriptions(self):
-        topic_list = self.get_topic_names_and_types()
-        for name, types in topic_list:
-            if 'vehicle_local_position' in name and 'px4_msgs/msg/VehicleLocalPosition' in types:
-                if name not in self.active_subs:
-                    try:
-                        # id'yi çek px4_1 -> 1
-                        uav_id = name.split('/')[1].replace('px4_', '')
-                        
-                        # lambda'daki late binding hatasını ezmek için uid=uav_id ataması yapıldı
-                        self.create_subscription(
-                            VehicleLocalPosition, 
-                            name, 
-                            lambda msg, uid=uav_id: self.metric_cb(msg, uid), 
-                            self.qos_fast
-                        )
-                        self.active_subs.add(name)
-                        self.get_logger().info(f"Yeni ucak eklendi ve dinleniyor: UAV_{uav_id}")
-                    except Exception as e:
-                        self.get_logger().error(f"Ucak eklenirken patladı: {e}")
+    def add_uav(self, name, match):
+        # id desendeki 'id' grubu: px4_1 -> 1
+        uav_id = match.group('id')
+
+        # lambda'daki late binding hatasını ezmek için uid=uav_id ataması yapıldı
+        subscription = self.create_subscription(
+            VehicleLocalPosition, 
+            name, 
+            lambda msg, uid=uav_id: self.metric_cb(msg, uid), 
+            self.qos_fast
+        )
+        self.get_logger().info(f"Yeni ucak eklendi ve dinleniyor: UAV_{uav_id}")
+        return subscription
+
+
+    # topici kaybolan uçak sunucu paketinden de çıksın
+    def remove_uav(self, name, match):
+        uav_id = match.group('id')
+        FLEET_METRICS.pop(uav_id, None)
+        self.get_logger().info(f"Ucak kayboldu, listeden cikarildi: UAV_{uav_id}")
 
 
     # veriyi havuza at
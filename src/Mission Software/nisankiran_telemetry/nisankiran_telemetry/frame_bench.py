@@ -0,0 +1,125 @@
+import argparse
+import array
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from .backends import _OnnxYoloBackend
+from .image_io import image_to_bgr
+
+
+# vision sıcak döngüsü mikro benchmark: kare başına ayrılan bayt ve süre, eski yol / yeni yol
+# eski yol: imgmsg_to_cv2 kopyası + her karede yeni letterbox/blob + yeni Float32MultiArray
+# yeni yol: msg.data üzerine view + yeniden kullanılan bufferlar + tek mesaj nesnesi
+#   ros2 run nisankiran_telemetry frame_bench --width 1280 --height 720 --encoding bgr8
+
+
+def make_msg(width, height, encoding):
+    data = array.array('B', np.random.default_rng(0).integers(0, 255, width * height * 3, dtype=np.uint8).tobytes())
+    try:
+        from sensor_msgs.msg import Image
+        msg = Image(width=width, height=height, step=width * 3, encoding=encoding)
+        msg.data = data
+        return msg
+    except ImportError:
+        return SimpleNamespace(width=width, height=height, step=width * 3, encoding=encoding, data=data)
+
+
+def new_bbox_msg():
+    try:
+        from std_msgs.msg import Float32MultiArray
+        return Float32MultiArray()
+    except ImportError:
+        return SimpleNamespace(data=None)
+
+
+# eski kod: cv_bridge (varsa) ya da aynı işi yapan kopya
+def legacy_decode(msg):
+    try:
+        from cv_bridge import CvBridge
+        return CvBridge().imgmsg_to_cv2(msg, "bgr8")
+    except ImportError:
+        frame = np.frombuffer(msg.data, dtype=np.uint8).reshape(msg.height, msg.width, 3).copy()
+        if msg.encoding == 'rgb8':
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        return frame
+
+
+def legacy_preprocess(frame, size):
+    h, w = frame.shape[:2]
+    scale = min(size / w, size / h)
+    nw, nh = int(round(w * scale)), int(round(h * scale))
+    pad_x, pad_y = (size - nw) // 2, (size - nh) // 2
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[pad_y:pad_y + nh, pad_x:pad_x + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    return cv2.dnn.blobFromImages([canvas], 1.0 / 255.0, swapRB=True)
+
+
+def legacy_step(msg, size):
+    frame = legacy_decode(msg)
+    legacy_preprocess(frame, size)
+    out = new_bbox_msg()
+    out.data = [-1.0, -1.0, 0.0, 0.0, 0.0]
+
+
+def make_fast_step(size):
+    pre = _OnnxYoloBackend(size)
+    out = new_bbox_msg()
+    out.data = array.array('f', [-1.0, -1.0, 0.0, 0.0, 0.0])
+    rgb_buf = []
+
+    def step(msg):
+        frame = image_to_bgr(msg, rgb_buf[0] if rgb_buf else None)
+        if msg.encoding == 'rgb8' and not rgb_buf:
+            rgb_buf.append(frame)
+        pre.preprocess([frame])
+        d = out.data
+        d[0], d[1], d[2], d[3], d[4] = -1.0, -1.0, 0.0, 0.0, 0.0
+
+    return step
+
+
+def measure(step, msg, iters):
+    step(msg) # ilk kare bufferları ayırır, ölçüme katma
+
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        step(msg)
+    per_frame_ms = (time.perf_counter() - t0) / iters * 1000.0
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(iters, 20)):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        step(msg)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    return per_frame_ms, float(np.median(peaks))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Vision hot-loop allocation/time micro-benchmark')
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--encoding', default='bgr8', choices=['bgr8', 'rgb8'])
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--iters', type=int, default=200)
+    opts = parser.parse_args(args)
+
+    msg = make_msg(opts.width, opts.height, opts.encoding)
+    fast_step = make_fast_step(opts.imgsz)
+
+    print(f"{opts.width}x{opts.height} {opts.encoding}, imgsz {opts.imgsz}")
+    print(f"{'path':<10}{'ms/frame':>10}{'KiB/frame':>12}")
+    for name, step in (('before', lambda m: legacy_step(m, opts.imgsz)), ('after', fast_step)):
+        ms, peak = measure(step, msg, opts.iters)
+        print(f"{name:<10}{ms:>10.3f}{peak / 1024.0:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import threading
+
+
+# kameradan gelen en son kareyi tutan tek elemanlı kutu
+# kamera yazar, inference thread'i okur. okunmadan üstüne yazılan kare düşmüş sayılır
+class LatestFrameSlot:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._closed = False
+
+        self.received = 0   # kameradan gelen toplam kare
+        self.dropped = 0    # işlenemeden ezilen kare
+        self.processed = 0  # inference'a giren kare
+
+    # kamera callback'i burayı çağırır, asla beklemez
+    def put(self, item):
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self.received += 1
+            self._cond.notify()
+
+    # en taze kareyi al ve kutuyu boşalt. timeout dolarsa ya da kapatıldıysa None
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._item is not None or self._closed, timeout):
+                return None
+            item = self._item
+            self._item = None
+            if item is not None:
+                self.processed += 1
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def stats(self):
+        with self._cond:
+            return self.received, self.processed, self.dropped
+
+
+
+# birden fazla kamera: her kamera için ayrı son kare kutusu
+# inference thread'i tüm kameraların en taze karelerini tek seferde alıp tek batch'te modele verir
+class LatestFrameSet:
+    def __init__(self, keys):
+        self._cond = threading.Condition()
+        self._items = {key: None for key in keys}
+        self._closed = False
+
+        self.received = dict.fromkeys(self._items, 0)
+        self.dropped = dict.fromkeys(self._items, 0)
+        self.processed = dict.fromkeys(self._items, 0)
+
+    def put(self, key, item):
+        with self._cond:
+            if self._items[key] is not None:
+                self.dropped[key] += 1
+            self._items[key] = item
+            self.received[key] += 1
+            self._cond.notify()
+
+    # en az bir kare gelene kadar bekle, sonra diğer kameralar için en fazla gather saniye daha
+    # kameralar senkron değil, yavaş kamera hızlı olanı bekletmesin diye gather kısa tutulur
+    # dönen: key -> kare, sadece yeni karesi olan kameralar. timeout ya da kapatıldıysa boş
+    def get_all(self, timeout=None, gather=0.0):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._any_ready() or self._closed, timeout):
+                return {}
+            if gather > 0 and not self._closed:
+                self._cond.wait_for(lambda: all(v is not None for v in self._items.values()) or self._closed, gather)
+
+            out = {}
+            for key, item in self._items.items():
+                if item is not None:
+                    out[key] = item
+                    self._items[key] = None
+                    self.processed[key] += 1
+            return out
+
+    def _any_ready(self):
+        return any(v is not None for v in self._items.values())
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    # key verilirse o kamera, yoksa toplam (received, processed, dropped)
+    def stats(self, key=None):
+        with self._cond:
+            if key is not None:
+                return self.received[key], self.processed[key], self.dropped[key]
+            return sum(self.received.values()), sum(self.processed.values()), sum(self.dropped.values())
@@ -0,0 +1,101 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import cv2
+
+from .frame_slot import LatestFrameSlot
+
+
+COLOR_YELLOW = (0, 255, 255)
+COLOR_RED = (0, 0, 255)
+COLOR_CYAN = (255, 255, 0)
+
+
+# inference thread'inin HUD için bıraktığı anlık durum, çizim burada yapılmaz
+@dataclass
+class HudState:
+    frame: object
+    header: object = None
+    bbox: Optional[Tuple[int, int, int, int]] = None
+    conf: float = 0.0
+    conf_label: str = "CONF"
+    lock_status: float = 0.0
+    lock_pct: int = 0
+    roi: Optional[Tuple[int, int, int, int]] = None
+    weapons_hot: bool = False
+
+
+
+# küçültülmüş kare üzerine overlay çiz, koordinatlar scale ile ölçeklenir
+def draw_hud(frame, state, scale=1.0):
+    def s(v):
+        return int(v * scale)
+
+    if state.bbox is not None:
+        x1, y1, x2, y2 = (s(v) for v in state.bbox)
+
+        if state.lock_status >= 1.0:
+            box_color = COLOR_RED
+            cv2.putText(frame, f"LOCK: {state.lock_pct}%", (x1, y2+20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_RED, 2)
+        else:
+            box_color = COLOR_YELLOW
+            cv2.putText(frame, "STANDBY", (x1, y2+20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_YELLOW, 2)
+
+        cv2.rectangle(frame, (x1, y1), (x2, y2), box_color, 2)
+        cv2.circle(frame, ((x1 + x2) // 2, (y1 + y2) // 2), 5, box_color, -1)#merkez
+        cv2.putText(frame, f"{state.conf_label}: {state.conf*100:.0f}%", (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, box_color, 2)
+
+    if state.roi is not None:
+        rx1, ry1, rx2, ry2 = (s(v) for v in state.roi)
+        cv2.rectangle(frame, (rx1, ry1), (rx2, ry2), COLOR_CYAN, 1) # arama penceresi
+
+    wso_text = "WSO: HOT" if state.weapons_hot else "WSO: STANDBY"
+    wso_color = COLOR_RED if state.weapons_hot else COLOR_YELLOW
+    cv2.putText(frame, wso_text, (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, wso_color, 2)
+    return frame
+
+
+
+# HUD'u arka planda sınırlı hızda çizen thread
+# inference sadece durumu bırakır, çizim/küçültme/encode burada olur. yetişemezse eski durumlar düşer
+class HudRenderer:
+    def __init__(self, on_frame, rate_hz=10.0, scale=0.5, stats=None):
+        self.on_frame = on_frame # (çizilmiş kare, durum) alır
+        self.stats = stats
+        self.period = 1.0 / rate_hz if rate_hz > 0 else 0.0
+        self.scale = scale
+
+        self.slot = LatestFrameSlot()
+        self.thread = threading.Thread(target=self.render_loop, daemon=True)
+        self.thread.start()
+
+    def submit(self, state):
+        self.slot.put(state)
+
+    def render_loop(self):
+        while not self.slot.closed:
+            state = self.slot.get(timeout=0.5)
+            if state is None:
+                continue
+
+            t0 = time.monotonic()
+            if self.scale != 1.0:
+                frame = cv2.resize(state.frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+            else:
+                frame = state.frame.copy()
+
+            frame = draw_hud(frame, state, self.scale)
+            if self.stats is not None:
+                self.stats.record('hud', time.monotonic() - t0)
+            self.on_frame(frame, state)
+
+            # hız sınırı
+            remaining = self.period - (time.monotonic() - t0)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def stop(self):
+        self.slot.close()
+        self.thread.join(timeout=1.0)
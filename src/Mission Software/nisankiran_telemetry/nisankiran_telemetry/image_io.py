@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+
+
+# sensor_msgs/Image -> BGR numpy, kopyasız hızlı yol
+# bgr8: msg.data üzerine doğrudan view (satır sonu dolgusu step ile atlanır)
+# rgb8: tek cvtColor, sonuç verilen buffer'a yazılır
+# diğer encodinglerde None döner, çağıran CvBridge'e düşer
+FAST_ENCODINGS = ('bgr8', 'rgb8')
+
+
+def image_view(msg):
+    if msg.encoding not in FAST_ENCODINGS:
+        return None
+    return np.ndarray(shape=(msg.height, msg.width, 3), dtype=np.uint8, buffer=msg.data, strides=(msg.step, 3, 1))
+
+
+def image_to_bgr(msg, out=None):
+    view = image_view(msg)
+    if view is None or msg.encoding == 'bgr8':
+        return view
+
+    if out is None or out.shape != view.shape:
+        out = np.empty(view.shape, dtype=np.uint8)
+    cv2.cvtColor(view, cv2.COLOR_RGB2BGR, dst=out)
+    return out
+
+
+
+# kareler arası yeniden kullanılan buffer havuzu, boyut değişirse yeniden ayrılır
+class BufferPool:
+    def __init__(self):
+        self.buffers = {}
+
+    def get(self, key, shape, dtype=np.uint8):
+        buf = self.buffers.get(key)
+        if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self.buffers[key] = buf
+        return buf
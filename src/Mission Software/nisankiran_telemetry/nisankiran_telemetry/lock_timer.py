@@ -0,0 +1,50 @@
+# kilitlenme sayacı, kare sayısı yerine kare zaman damgasıyla (saniye)
+# kare düşürünce ya da inference yavaşlayınca gereken kilit süresi uzamasın diye
+# 0: kilit yok, 1: kilitleniyor, 2: süre doldu (vuruş)
+
+LOCK_NONE = 0.0
+LOCK_ACTIVE = 1.0
+LOCK_KILL = 2.0
+
+
+class LockTimer:
+    def __init__(self, lock_seconds=4.0, tolerance_seconds=1.0):
+        self.lock_seconds = lock_seconds
+        self.tolerance_seconds = tolerance_seconds # bu kadar süre hedef kaçarsa kilit sıfırlanır
+
+        self.lock_start = None
+        self.last_lock_time = None
+        self.last_time = None
+
+    def reset(self):
+        self.lock_start = None
+        self.last_lock_time = None
+
+    # t: karenin zaman damgası, locked: hedef görüldü ve weapons hot
+    def update(self, t, locked):
+        # sırası karışmış eski kare sayacı geri saramasın
+        if self.last_time is not None and t < self.last_time:
+            return LOCK_ACTIVE if (locked and self.lock_start is not None) else LOCK_NONE
+        self.last_time = t
+
+        if not locked:
+            if self.last_lock_time is not None and t - self.last_lock_time > self.tolerance_seconds: #timeout kontrolü
+                self.reset()
+            return LOCK_NONE
+
+        if self.lock_start is None or t - self.last_lock_time > self.tolerance_seconds:
+            self.lock_start = t
+        self.last_lock_time = t
+
+        if t - self.lock_start >= self.lock_seconds:
+            self.reset()
+            return LOCK_KILL
+        return LOCK_ACTIVE
+
+    def elapsed(self):
+        if self.lock_start is None:
+            return 0.0
+        return self.last_lock_time - self.lock_start
+
+    def progress(self):
+        return min(self.elapsed() / self.lock_seconds, 1.0) if self.lock_seconds > 0 else 0.0
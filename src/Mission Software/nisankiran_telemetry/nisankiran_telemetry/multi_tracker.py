@@ -0,0 +1,137 @@
+import numpy as np
+
+from .detection import iou_matrix
+
+
+# birden fazla uçak görünürken her tespite kalıcı iz ID'si veren hafif eşleştirici (ByteTrack benzeri)
+# izler sabit hızla bir sonraki tespite taşınır, eşleşme IoU ile
+# önce yüksek güvenli tespitler, artan izler düşük güvenli tespitlerle eşleşir (örtülen/bulanık hedef izini kaybetmesin)
+# birkaç hedef için 0.1 ms mertebesi, kare gecikmesine etkisi yok
+
+
+class Track:
+    __slots__ = ('track_id', 'box', 'velocity', 'conf', 'cls', 'hits', 'misses')
+
+    def __init__(self, track_id, box, conf, cls):
+        self.track_id = track_id
+        self.box = box.astype(float)  # xyxy
+        self.velocity = np.zeros(4)   # piksel / tespit adımı
+        self.conf = conf
+        self.cls = cls
+        self.hits = 1
+        self.misses = 0               # art arda eşleşmediği tespit adımı
+
+
+# greedy eşleştirme: en yüksek IoU'dan başla, satır ve sütun bir kez kullanılır
+# birkaç hedefte Hungarian ile aynı sonucu verir, scipy gerektirmez
+def greedy_match(iou, threshold):
+    matches = []
+    if iou.size == 0:
+        return matches
+    used_rows, used_cols = set(), set()
+    for flat in np.argsort(-iou, axis=None):
+        r, c = divmod(int(flat), iou.shape[1])
+        if iou[r, c] < threshold:
+            break
+        if r in used_rows or c in used_cols:
+            continue
+        used_rows.add(r)
+        used_cols.add(c)
+        matches.append((r, c))
+    return matches
+
+
+class MultiTracker:
+    def __init__(self, high_conf=0.5, match_iou=0.3, max_misses=15, min_hits=1, max_detections=32):
+        self.high_conf = high_conf   # bunun altı var olan izlerle ikinci turda eşleşir
+        self.match_iou = match_iou
+        self.max_misses = max_misses # bu kadar tespit adımı görülmeyen iz silinir
+        self.min_hits = min_hits     # iz bu kadar eşleşmeden sonra onaylı sayılır
+        self.max_detections = max_detections # en güvenilir bu kadar tespit eşleşir, gürültülü karede süre patlamasın
+        self.tracks = []
+        self.next_id = 1
+
+    def reset(self):
+        self.tracks = []
+
+    def get(self, track_id):
+        for track in self.tracks:
+            if track.track_id == track_id:
+                return track
+        return None
+
+    # kamera dönüşü: her izi kendi konumundaki kayma kadar ötele, shift_fn(box) -> (dx, dy) ya da None
+    def compensate(self, shift_fn):
+        for track in self.tracks:
+            shift = shift_fn(track.box)
+            if shift is not None:
+                track.box = track.box + np.array([shift[0], shift[1], shift[0], shift[1]])
+
+    # tespit arası karede izi takipçinin kutusuna taşı (detect-then-track)
+    # hız tespit adımı başına olduğu için sıfırlanır, kutu zaten güncel, bir sonraki tespitte bu kutuyla eşleşir
+    def observe(self, track_id, box):
+        track = self.get(track_id)
+        if track is not None:
+            track.box = np.asarray(box, dtype=float)
+            track.velocity = np.zeros(4)
+
+    def confirmed(self, track):
+        return track.hits >= self.min_hits
+
+    # bir tespit adımı. dönen: her tespitin iz ID'si, eşleşmediyse -1
+    def update(self, boxes, confs, clss):
+        track_ids = np.full(len(confs), -1, dtype=int)
+
+        # sabit hız tahmini
+        for track in self.tracks:
+            track.box = track.box + track.velocity
+        predicted = np.array([t.box for t in self.tracks]).reshape(-1, 4)
+
+        candidates = np.arange(len(confs))
+        if len(confs) > self.max_detections:
+            candidates = np.argpartition(-confs, self.max_detections)[:self.max_detections]
+        high = candidates[confs[candidates] >= self.high_conf]
+        low = candidates[confs[candidates] < self.high_conf]
+
+        # 1. tur: yüksek güvenli tespitler tüm izlerle
+        matched = set()
+        for r, c in greedy_match(iou_matrix(predicted, boxes[high]), self.match_iou):
+            self._apply(self.tracks[r], boxes[high[c]], confs[high[c]], clss[high[c]])
+            track_ids[high[c]] = self.tracks[r].track_id
+            matched.add(r)
+
+        # 2. tur: kalan izler düşük güvenli tespitlerle
+        rest = [i for i in range(len(self.tracks)) if i not in matched]
+        if rest and len(low):
+            for r, c in greedy_match(iou_matrix(predicted[rest], boxes[low]), self.match_iou):
+                track = self.tracks[rest[r]]
+                self._apply(track, boxes[low[c]], confs[low[c]], clss[low[c]])
+                track_ids[low[c]] = track.track_id
+                matched.add(rest[r])
+
+        for i, track in enumerate(self.tracks):
+            if i not in matched:
+                track.misses += 1
+                track.velocity *= 0.5 # görülmeyen iz yavaşça dursun, uzağa sürüklenmesin
+
+        # eşleşmeyen tespitler yeni iz, önce yüksek güvenliler (ID sırası güvene göre)
+        # eşiği geçen her tespit eskiden kilitlenebiliyordu, düşük güvenli tek hedef de iz açabilsin
+        for i in np.concatenate((high, low)):
+            if track_ids[i] < 0:
+                self.tracks.append(Track(self.next_id, boxes[i], float(confs[i]), int(clss[i])))
+                track_ids[i] = self.next_id
+                self.next_id += 1
+
+        # tek karelik iz (yanlış tespit olabilir) ilk ıskada silinir, iz sayısı şişmesin
+        self.tracks = [t for t in self.tracks if t.misses <= (self.max_misses if t.hits > 1 else 0)]
+        return track_ids
+
+    def _apply(self, track, box, conf, cls):
+        # tahmin öncesi kutuya göre yeni hız, ani sıçramaya karşı yumuşatılmış
+        prev = track.box - track.velocity
+        track.velocity = 0.5 * track.velocity + 0.5 * (box - prev)
+        track.box = box.astype(float)
+        track.conf = float(conf)
+        track.cls = int(cls)
+        track.hits += 1
+        track.misses = 0
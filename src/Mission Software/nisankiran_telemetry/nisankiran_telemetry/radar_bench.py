@@ -0,0 +1,112 @@
+import argparse
+import math
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from .target_table import TargetTable
+
+
+# radar hedef seçimi benchmark: kalabalık hava sahası, eski dict+döngü / yeni numpy tablo
+# bir radar turu = hedef seçimi + kilitli hedefe mesafe/hizalanma (weapons hot)
+# ros gerekmez
+#   ros2 run nisankiran_telemetry radar_bench --targets 200
+
+
+def make_fleet(n, area, seed=0):
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(-area / 2.0, area / 2.0, (n, 3))
+    pos[:, 2] = rng.uniform(-150.0, -30.0, n)
+    vel = rng.normal(0.0, 20.0, (n, 3))
+    hits = rng.integers(0, 3, n)
+    return pos, vel, hits
+
+
+# eski WSORadar yapısı: uçak başına nesne + tam mesaj, python döngüsü
+def legacy_fleet(pos, hits, now):
+    targets = {}
+    for i, (p, h) in enumerate(zip(pos, hits)):
+        msg = SimpleNamespace(x=float(p[0]), y=float(p[1]), z=float(p[2]))
+        targets[str(i + 2)] = SimpleNamespace(last_position=msg, hit_count=int(h), last_seen_time=now)
+    return targets
+
+
+def legacy_step(targets, me, now):
+    best_target_id = None
+    min_hits = float('inf')
+    min_dist = float('inf')
+    for uav_id, target_obj in targets.items():
+        if not (now - target_obj.last_seen_time) < 3.0:
+            continue
+        pos = target_obj.last_position
+        dist = math.sqrt((pos.x - me.x) ** 2 + (pos.y - me.y) ** 2 + (pos.z - me.z) ** 2)
+        if target_obj.hit_count < min_hits:
+            min_hits, min_dist, best_target_id = target_obj.hit_count, dist, uav_id
+        elif target_obj.hit_count == min_hits and dist < min_dist:
+            min_dist, best_target_id = dist, uav_id
+
+    pos = targets[best_target_id].last_position
+    dx, dy, dz = pos.x - me.x, pos.y - me.y, pos.z - me.z
+    dist = math.sqrt(dx ** 2 + dy ** 2 + dz ** 2)
+    alignment = math.cos(me.heading - math.atan2(dy, dx))
+    return best_target_id, dist < 100.0 and alignment > 0.4
+
+
+# gated: menzil + geniş görüş konisi (WSORadar varsayılanları)
+def table_step(table, own_pos, heading, now, select_range=None):
+    gate = {} if select_range is None else {'max_range': select_range, 'heading': heading}
+    best_target_id, _ = table.select(own_pos, now, **gate)
+    rows, _, _ = table.in_cone(own_pos, heading, 100.0, 0.4, now)
+    return best_target_id, bool(table.index[best_target_id] in rows)
+
+
+def measure(step, iters):
+    for _ in range(10):
+        step()
+    samples = []
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        step()
+        samples.append(time.perf_counter() - t0)
+    samples = np.array(samples) * 1000.0
+    return float(np.mean(samples)), float(np.percentile(samples, 99))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='WSORadar target selection benchmark')
+    parser.add_argument('--targets', type=int, default=200)
+    parser.add_argument('--iters', type=int, default=2000)
+    parser.add_argument('--area', type=float, default=4000.0, help='airspace edge length (m)')
+    parser.add_argument('--select-range', type=float, default=1000.0, help='candidate gate for the gated path (m)')
+    parser.add_argument('--budget-ms', type=float, default=1.0)
+    opts = parser.parse_args(args)
+
+    now = time.time()
+    pos, vel, hits = make_fleet(opts.targets, opts.area)
+    me = SimpleNamespace(x=0.0, y=0.0, z=-80.0, heading=0.3)
+    own_pos = np.array([me.x, me.y, me.z])
+
+    table = TargetTable()
+    for i in range(opts.targets):
+        table.update(str(i + 2), pos[i], vel[i], now)
+        table.hit_count[table.index[str(i + 2)]] = hits[i]
+    targets = legacy_fleet(pos, hits, now)
+
+    legacy_pick = legacy_step(targets, me, now)
+    table_pick = table_step(table, own_pos, me.heading, now)
+    if legacy_pick != table_pick:
+        print(f"MISMATCH legacy {legacy_pick} table {table_pick}")
+
+    print(f"{opts.targets} targets, {opts.iters} radar passes")
+    print(f"{'path':<10}{'mean ms':>10}{'p99 ms':>10}")
+    for name, step in (('before', lambda: legacy_step(targets, me, now)),
+                       ('table', lambda: table_step(table, own_pos, me.heading, now)),
+                       ('gated', lambda: table_step(table, own_pos, me.heading, now, opts.select_range))):
+        mean, p99 = measure(step, opts.iters)
+        verdict = 'ok' if p99 < opts.budget_ms else 'OVER BUDGET'
+        print(f"{name:<10}{mean:>10.3f}{p99:>10.3f}  {verdict}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+import rclpy
+from rclpy.node import Node
+from rclpy.parameter import Parameter
+from rclpy.executors import SingleThreadedExecutor
+from rclpy.qos import QoSProfile, ReliabilityPolicy, DurabilityPolicy, HistoryPolicy
+from px4_msgs.msg import VehicleLocalPosition
+from std_msgs.msg import Bool
+from nisankiran_interfaces.srv import TargetKill
+
+from .server_listener import WSORadar, make_executor
+
+
+# WSORadar yük testi: çok sayıda uçak yayıncısı altında karar gecikmesi, executor thread sayısına göre
+# aynı süreçte: radar kendi executor'ında, yük + ölçüm düğümü ayrı executor'da
+#   karar gecikmesi: kendi konumumuz hedefe yaklaşıp uzaklaşır, konum yayınından /weapons_hot değişimine kadar geçen süre
+#   kill gecikmesi: confirm_kill isteğinden cevaba kadar geçen süre
+#   ros2 run nisankiran_telemetry radar_stress --publishers 100 --rate 50 --threads 1,4
+
+
+class StressLoad(Node):
+    def __init__(self, publishers, rate, seed=0):
+        super().__init__('radar_stress_load')
+        self.qos_fast = QoSProfile(
+            reliability=ReliabilityPolicy.BEST_EFFORT,
+            durability=DurabilityPolicy.VOLATILE,
+            history=HistoryPolicy.KEEP_LAST,
+            depth=1
+        )
+        qos_reliable = QoSProfile(
+            reliability=ReliabilityPolicy.RELIABLE,
+            durability=DurabilityPolicy.TRANSIENT_LOCAL,
+            history=HistoryPolicy.KEEP_LAST,
+            depth=1
+        )
+
+        # px4_1 biziz, px4_2 en yakın hedef (kilitlenecek olan), diğerleri 1-2 km uzakta
+        rng = np.random.default_rng(seed)
+        self.positions = {}
+        for i in range(2, publishers + 2):
+            angle = rng.uniform(-np.pi, np.pi)
+            dist = 0.0 if i == 2 else rng.uniform(1000.0, 2000.0)
+            self.positions[str(i)] = (dist * np.cos(angle), dist * np.sin(angle), -80.0)
+        self.pubs = {uid: self.create_publisher(VehicleLocalPosition, f"/px4_{uid}/fmu/out/vehicle_local_position", self.qos_fast)
+                     for uid in ['1'] + list(self.positions)}
+
+        self.want_hot = False
+        self.toggle_t = None
+        self.decision_ms = []
+        self.kill_ms = []
+        self.measure_decision = False
+
+        self.create_timer(1.0 / rate, self.publish_all)
+        self.create_subscription(Bool, '/weapons_hot', self.weapons_cb, qos_reliable)
+        self.kill_client = self.create_client(TargetKill, 'confirm_kill')
+
+    def make_msg(self, pos, heading=0.0):
+        msg = VehicleLocalPosition()
+        msg.timestamp = int(time.monotonic() * 1e6)
+        msg.x, msg.y, msg.z = (float(v) for v in pos)
+        msg.vx = msg.vy = msg.vz = 0.0
+        msg.xy_valid = msg.z_valid = msg.v_xy_valid = msg.v_z_valid = True
+        msg.heading = heading
+        return msg
+
+    # hot: hedefin 30 m gerisinde ona dönük, cold: 300 m gerisinde
+    def publish_own(self):
+        tx, ty, tz = self.positions['2']
+        back = 30.0 if self.want_hot else 300.0
+        self.pubs['1'].publish(self.make_msg((tx - back, ty, tz)))
+
+    def publish_all(self):
+        self.publish_own()
+        for uid, pos in self.positions.items():
+            self.pubs[uid].publish(self.make_msg(pos))
+
+    def toggle(self):
+        self.want_hot = not self.want_hot
+        self.toggle_t = time.perf_counter()
+        self.publish_own()
+
+    def weapons_cb(self, msg):
+        if self.measure_decision and self.toggle_t is not None and msg.data == self.want_hot:
+            self.decision_ms.append((time.perf_counter() - self.toggle_t) * 1000.0)
+            self.toggle_t = None
+
+    def send_kill(self):
+        req = TargetKill.Request()
+        req.target_id = 'stress'
+        t0 = time.perf_counter()
+        future = self.kill_client.call_async(req)
+        future.add_done_callback(lambda _, t0=t0: self.kill_ms.append((time.perf_counter() - t0) * 1000.0))
+
+
+def spin_in_thread(executor):
+    thread = threading.Thread(target=executor.spin, daemon=True)
+    thread.start()
+    return thread
+
+
+def summary(samples):
+    if not samples:
+        return f"{'-':>8}{'-':>8}{'-':>8}{0:>6}"
+    s = np.array(samples)
+    return f"{np.percentile(s, 50):>8.1f}{np.percentile(s, 99):>8.1f}{s.max():>8.1f}{len(s):>6}"
+
+
+def run(threads, opts):
+    radar = WSORadar(parameter_overrides=[Parameter('executor_threads', value=threads)])
+    radar_executor = make_executor(radar)
+    radar_executor.add_node(radar)
+    load = StressLoad(opts.publishers, opts.rate)
+    load_executor = SingleThreadedExecutor()
+    load_executor.add_node(load)
+    spin_in_thread(radar_executor)
+    spin_in_thread(load_executor)
+
+    try:
+        time.sleep(opts.warmup) # keşif + ilk kilit
+
+        # faz 1: weapons hot aç/kapa
+        load.measure_decision = True
+        end = time.monotonic() + opts.duration
+        while time.monotonic() < end:
+            load.toggle()
+            time.sleep(opts.toggle_period)
+        load.measure_decision = False
+
+        # faz 2: kill servisi (her kill kilidi başka hedefe taşır, o yüzden ayrı faz)
+        load.kill_client.wait_for_service(timeout_sec=2.0)
+        end = time.monotonic() + opts.duration
+        while time.monotonic() < end:
+            load.send_kill()
+            time.sleep(1.0 / opts.kill_rate)
+        time.sleep(0.5)
+
+        return load.decision_ms, load.kill_ms
+    finally:
+        radar_executor.shutdown()
+        load_executor.shutdown()
+        radar.destroy_node()
+        load.destroy_node()
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='WSORadar decision latency under many position publishers')
+    parser.add_argument('--publishers', type=int, default=100, help='simulated enemy aircraft')
+    parser.add_argument('--rate', type=float, default=50.0, help='position rate per aircraft (Hz)')
+    parser.add_argument('--threads', default='1,4', help='executor thread counts to compare, 1 = single threaded')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per phase')
+    parser.add_argument('--warmup', type=float, default=3.0)
+    parser.add_argument('--toggle-period', type=float, default=0.3)
+    parser.add_argument('--kill-rate', type=float, default=5.0)
+    opts = parser.parse_args(args)
+
+    rclpy.init()
+    try:
+        results = [(threads, *run(threads, opts)) for threads in (int(t) for t in opts.threads.split(','))]
+    finally:
+        rclpy.shutdown()
+
+    print(f"{opts.publishers} aircraft @ {opts.rate:g} Hz")
+    print(f"{'threads':<8}{'decision ms p50/p99/max/n':>30}{'kill ms p50/p99/max/n':>30}")
+    for threads, decision, kill in results:
+        print(f"{threads:<8}{summary(decision):>30}{summary(kill):>30}")
+
+
+if __name__ == '__main__':
+    main()
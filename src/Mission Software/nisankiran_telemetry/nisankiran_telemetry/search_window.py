@@ -0,0 +1,73 @@
+import math
+
+import numpy as np
+
+
+# kilitliyken hedef bir önceki kutunun yakınında olur, tüm kareyi taramak gereksiz
+# arama penceresi ya son tespitten ya da radarın 3B hedefinin kameraya izdüşümünden çıkar
+
+
+# PX4 vehicle_attitude.q (w, x, y, z): FRD gövde -> NED dönüşümü
+def quat_to_rot(q):
+    w, x, y, z = q
+    return np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)],
+        [2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)],
+        [2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)],
+    ])
+
+
+# yatay görüş açısından pinhole odak uzaklığı (piksel)
+def focal_from_hfov(width, hfov_deg):
+    return (width / 2.0) / math.tan(math.radians(hfov_deg) / 2.0)
+
+
+# NED göreli konumu kamera pikseline çevir -> (u, v, derinlik) ya da kameranın arkasındaysa None
+# kamera gövde x eksenine bakıyor, cam_pitch_deg kadar yukarı eğik takılabilir
+def project_ned_to_image(rel_ned, q, fx, fy, cx, cy, cam_pitch_deg=0.0):
+    body = quat_to_rot(q).T @ np.asarray(rel_ned, dtype=float)
+
+    if cam_pitch_deg:
+        p = math.radians(cam_pitch_deg)
+        c, s = math.cos(p), math.sin(p)
+        # kamerayı yukarı eğmek = noktayı gövde y ekseni etrafında ters döndürmek
+        body = np.array([c * body[0] - s * body[2], body[1], s * body[0] + c * body[2]])
+
+    depth = body[0]
+    if depth <= 0.1:
+        return None
+
+    # FRD gövde: ileri x, sağ y, aşağı z -> görüntü u sağa, v aşağı
+    u = cx + fx * body[1] / depth
+    v = cy + fy * body[2] / depth
+    return u, v, depth
+
+
+# merkez ve yarı boylardan kadraja sıkıştırılmış (x1, y1, x2, y2)
+def clamp_window(cx, cy, half_w, half_h, width, height, min_size=0):
+    half_w = max(half_w, min_size / 2.0)
+    half_h = max(half_h, min_size / 2.0)
+
+    # kadraja sığmıyorsa kenara yasla, boyutu koru
+    w = int(min(2 * half_w, width))
+    h = int(min(2 * half_h, height))
+    x1 = int(min(max(cx - w / 2.0, 0), width - w))
+    y1 = int(min(max(cy - h / 2.0, 0), height - h))
+    return x1, y1, x1 + w, y1 + h
+
+
+# son kutunun etrafında pencere: boyut kutuya ve kutunun kareler arası hızına göre büyür
+def window_from_bbox(bbox, velocity, width, height, scale=3.0, min_size=160):
+    x1, y1, x2, y2 = bbox
+    vx, vy = velocity
+    half_w = (x2 - x1) * scale / 2.0 + abs(vx) * 2.0
+    half_h = (y2 - y1) * scale / 2.0 + abs(vy) * 2.0
+    return clamp_window((x1 + x2) / 2.0, (y1 + y2) / 2.0, half_w, half_h, width, height, min_size)
+
+
+# radar ipucundan pencere: beklenen hedef boyu = f * kanat açıklığı / mesafe
+def window_from_projection(u, v, depth, fx, width, height, span_m=2.0, scale=4.0, min_size=192):
+    half = fx * span_m / depth * scale / 2.0
+    if u < -half or v < -half or u > width + half or v > height + half:
+        return None
+    return clamp_window(u, v, half, half, width, height, min_size)
@@ -1,34 +1,42 @@
 import rclpy
 from rclpy.node import Node
+from rclpy.callback_groups import MutuallyExclusiveCallbackGroup, ReentrantCallbackGroup
+from rclpy.executors import MultiThreadedExecutor, SingleThreadedExecutor
 from geometry_msgs.msg import PoseArray, Pose
+from nav_msgs.msg import Odometry
 from px4_msgs.msg import VehicleLocalPosition
 from std_msgs.msg import Bool
 from rclpy.qos import QoSProfile, ReliabilityPolicy, DurabilityPolicy, qos_profile_sensor_data
 from nisankiran_interfaces.srv import TargetKill
-import math
+import threading
 import time
 
-from dataclasses import dataclass, field
-from typing import Dict, Optional
-
-# struct
-@dataclass
-class EnemyState:
-    id: str
-    last_position: VehicleLocalPosition = None
-    hit_count: int = 0
-    last_seen_time: float = 0.0
-
-    def is_active(self, timeout=3.0):
-        
-        return (time.time() - self.last_seen_time) < timeout # 3 saniye timeout
-
-    
+import numpy as np
+from typing import Optional
 
+from .target_table import TargetTable
+from .topic_discovery import TopicDiscovery, DEFAULT_POSITION_PATTERN
 
 class WSORadar(Node):
-    def __init__(self):
-        super().__init__('wso_radar_node')
+    def __init__(self, **kwargs):
+        super().__init__('wso_radar_node', **kwargs)
+
+        # CALLBACK GRUPLARI -----------
+        # ingest: konum aboneliklerinin hepsi, birbirini beklemesin (reentrant)
+        # decision: değerlendirme timer'ları, tek tek çalışır
+        # services: kill servisi konum seli arkasında sıra beklemesin
+        # discovery: topic keşfi, grafik taraması değerlendirmeyi bekletmesin
+        self.ingest_group = ReentrantCallbackGroup()
+        self.decision_group = MutuallyExclusiveCallbackGroup()
+        self.service_group = MutuallyExclusiveCallbackGroup()
+        self.discovery_group = MutuallyExclusiveCallbackGroup()
+
+        # lock: hedef tablosu, my_pos, kilit ve yayın durumu; tutulan iş kısa (tablo yazma / ~0.1 ms değerlendirme)
+        # eval_lock: aynı anda tek değerlendirme, dolu ise bekleme yapılmaz, pending'e bırakılır
+        self.lock = threading.Lock()
+        self.eval_lock = threading.Lock()
+        self.declare_parameter('executor_threads', 4) # 1: eski tek thread'li executor
+        # CALLBACK GRUPLARI -----------/
 
         
         # QoS PROFİLLERİ -----------
@@ -58,20 +66,69 @@ class WSORadar(Node):
         self.enemy_pub = self.create_publisher(PoseArray, '/enemy_telemetry', self.qos_fast_telemetry)
         self.hedef_pub = self.create_publisher(Pose, '/locked_target', self.qos_reliable)  # qos_fast_telemetry de sıkıntı çıktı reliable daha güvenilir
         self.weapons_pub = self.create_publisher(Bool, '/weapons_hot', self.qos_reliable)
+        # kilitli hedefin şimdiye taşınmış konum + hız + kovaryansı (NED, eksenler bağımsız: kovaryans köşegen)
+        self.state_pub = self.create_publisher(Odometry, '/locked_target_state', self.qos_fast_telemetry)
         
         
         # özel kill servisi
-        self.kill_service = self.create_service(TargetKill, 'confirm_kill', self.handle_kill_request)
+        self.kill_service = self.create_service(TargetKill, 'confirm_kill', self.handle_kill_request, callback_group=self.service_group)
 
 
         self.my_pos: Optional[VehicleLocalPosition] = None
-        self.targets: Dict[str, EnemyState] = {} # UAV_ID -> EnemyState eski adı(TrackedTarget) 
-        self.active_subs = set()
+        # hedef filtresi: sabit hız modeli, konum + hız ölçümü, yayınlanan konum şimdiki zamana taşınır
+        self.declare_parameter('target_accel_std', 3.0)          # m/s^2, hedefin manevra payı
+        self.declare_parameter('target_pos_std', 1.0)            # m
+        self.declare_parameter('target_vel_std', 0.5)            # m/s
+        self.declare_parameter('target_max_extrapolation', 2.0)  # s, bundan eski veri daha fazla ileri taşınmaz
+        self.declare_parameter('target_history_len', 256)        # hedef başına saklanan ham örnek (halka buffer)
+        self.targets = TargetTable(
+            accel_std=self.get_parameter('target_accel_std').value,
+            pos_std=self.get_parameter('target_pos_std').value,
+            vel_std=self.get_parameter('target_vel_std').value,
+            max_extrapolation=self.get_parameter('target_max_extrapolation').value,
+            history_len=self.get_parameter('target_history_len').value,
+        ) # UAV_ID -> satır, konum/hız/kovaryans/son görülme/vuruş numpy dizilerinde + ızgara indeksi
+        # hedef seçiminde sadece bu menzildeki uçaklar puanlanır (menzilde kimse yoksa hepsi), 0: menzil yok
+        self.declare_parameter('select_range', 1000.0)
+        self.select_range = self.get_parameter('select_range').value or None
+        # menzildeki adaylardan sadece burnun önündeki geniş konide olanlar (cos, -0.5: ±120 derece), -1: koni yok
+        # arkadaki hedefe kilitlenip dönmek yerine öndekini seç; konide kimse yoksa yine de en iyi hedef seçilir
+        self.declare_parameter('select_min_alignment', -0.5)
+        self.select_min_alignment = self.get_parameter('select_min_alignment').value
         self.locked_target_id: Optional[str] = None 
 
+        # uçak topicleri: desen 'id' grubunu içermeli, yeni uçak ~0.5 sn içinde görülür, kaybolan uçağın aboneliği silinir
+        self.declare_parameter('position_topic_pattern', DEFAULT_POSITION_PATTERN)
+        self.declare_parameter('discovery_period', 0.5)
+
         #  TIMERS 
-        self.create_timer(2.0, self.update_subscriptions)
-        self.create_timer(0.5, self.radar_loop)
+        self.discovery = TopicDiscovery(
+            self,
+            self.get_parameter('position_topic_pattern').value,
+            'px4_msgs/msg/VehicleLocalPosition',
+            self.add_uav,
+            self.remove_uav,
+            self.get_parameter('discovery_period').value,
+            callback_group=self.discovery_group,
+        )
+
+        # radar değerlendirmesi kendi konumumuz ya da kilitli hedef güncellenince tetiklenir, tavan hızla sınırlı
+        # yavaş timer sadece mesaj gelmeyince zaman aşımını yakalamak için
+        self.declare_parameter('radar_max_rate_hz', 50.0)
+        self.declare_parameter('locked_target_rate_hz', 20.0) # OffboardFighter control_loop hızı
+        self.declare_parameter('weapons_keepalive', 1.0)      # /weapons_hot değişmese de bu aralıkla tekrar basılır
+        self.eval_period = 1.0 / max(self.get_parameter('radar_max_rate_hz').value, 1e-3)
+        self.target_period = 1.0 / max(self.get_parameter('locked_target_rate_hz').value, 1e-3)
+        self.weapons_keepalive = self.get_parameter('weapons_keepalive').value
+
+        self.last_eval = 0.0
+        self.eval_pending = False
+        self.last_target_pub = 0.0
+        self.last_hot: Optional[bool] = None
+        self.last_hot_pub = 0.0
+
+        self.create_timer(self.eval_period, self.flush_pending, callback_group=self.decision_group)
+        self.create_timer(0.5, self.radar_loop, callback_group=self.decision_group)
         
         self.get_logger().info("WSO Init")
 
@@ -79,52 +136,65 @@ class WSORadar(Node):
 
     # Özel servis vision ie haberleş
     def handle_kill_request(self, request, response):
-        if self.locked_target_id and self.locked_target_id in self.targets: # id none and id in targets
-            self.get_logger().info(f"Target destroyed: {request.target_id}")
-            
-            # nesne üzerinden hit_count artırımı 
-            self.targets[self.locked_target_id].hit_count += 1
-            self.locked_target_id = None
-            
-            hot_msg = Bool()
-            hot_msg.data = False
-            self.weapons_pub.publish(hot_msg)
+        with self.lock:
+            if self.locked_target_id and self.locked_target_id in self.targets: # id none and id in targets
+                self.get_logger().info(f"Target destroyed: {request.target_id}")
+                
+                self.targets.hit(self.locked_target_id)
+                self.locked_target_id = None
+                
+                self.publish_weapons(False)
             
         response.success = True
         return response
     
 
 
-    #Tüm uçakları süreki tara
-    def update_subscriptions(self):
-        topic_list = self.get_topic_names_and_types()
+    # yeni uçak topici bulundu
+    def add_uav(self, name, match):
+        uav_id = match.group('id')
+        self.get_logger().info(f"UAV_{uav_id} discovered: {name}")
+        return self.create_subscription(VehicleLocalPosition, name, lambda msg, uid=uav_id: self.universal_cb(msg, uid), self.qos_fast_telemetry, callback_group=self.ingest_group) # qos_profile_sensor_data yerine kendi profilimiz
+
+
+    # uçağın topici yok oldu: durumu sil, kilitliysek kilidi kır
+    def remove_uav(self, name, match):
+        uav_id = match.group('id')
+        self.get_logger().warn(f"UAV_{uav_id} topic vanished: {name}")
+        with self.lock:
+            if uav_id == '1':
+                self.my_pos = None
+                return
+
+            self.targets.remove(uav_id)
+            if self.locked_target_id == uav_id:
+                self.locked_target_id = None
+                self.publish_weapons(False)
 
-        for name, types in topic_list:
-            if 'vehicle_local_position' in name and 'px4_msgs/msg/VehicleLocalPosition' in types:
-                if name not in self.active_subs:
-                    # eğer takip edilen topicler yok olursa destroy da edebilirim ilerde burda ancak gerek yok
-                    # yeni subcribtoinları ekle
-                    self.create_subscription(VehicleLocalPosition, name, lambda msg, n=name: self.universal_cb(msg, n), self.qos_fast_telemetry) # qos_profile_sensor_data yerine kendi profilimiz
-                    self.active_subs.add(name)
-                    
 
 
 
 
     # isim atamalarını sağla
-    def universal_cb(self, msg, topic_name):
+    def universal_cb(self, msg, uav_id):
         if msg.timestamp > 0:
             try:
-                uav_id = topic_name.split('/')[1].replace('px4_', '')
-                if uav_id == '1': 
-                    self.my_pos = msg
-                else:
-                    if uav_id not in self.targets:
-                        self.targets[uav_id] = EnemyState(id=uav_id)
-                    
-                    
-                    self.targets[uav_id].last_position = msg
-                    self.targets[uav_id].last_seen_time = time.time()
+                with self.lock:
+                    # PX4 geçerlilik bayrakları: geçersiz eksen filtreye NaN gider, o ölçüm atlanır
+                    # (EKF reset ya da GPS kaybında o eksen güvenilmez, hedefi oraya çekmesin)
+                    if uav_id == '1': 
+                        if msg.xy_valid and msg.z_valid: # kendi konumumuz eksikse eskisi kalır
+                            self.my_pos = msg
+                    else:
+                        nan = float('nan')
+                        pos = (msg.x if msg.xy_valid else nan, msg.y if msg.xy_valid else nan, msg.z if msg.z_valid else nan)
+                        vel = (msg.vx if msg.v_xy_valid else nan, msg.vy if msg.v_xy_valid else nan, msg.vz if msg.v_z_valid else nan)
+                        self.targets.update(uav_id, pos, vel, time.time(), msg.heading)
+
+                    # diğer uçakların güncellemesi kilit yokken seçimi tetikler, kilit varken değerlendirmeye etkisi yok
+                    trigger = uav_id == '1' or uav_id == self.locked_target_id or self.locked_target_id is None
+                if trigger:
+                    self.request_evaluation()
             except Exception as e:
                 self.get_logger().error(f"CB Error: {e}")
 
@@ -132,47 +202,46 @@ class WSORadar(Node):
 
 
 
+    # tavan hızın altındaysa hemen değerlendir, değilse sıradaki timer turuna bırak
+    def request_evaluation(self):
+        if time.monotonic() - self.last_eval >= self.eval_period:
+            self.radar_loop()
+        else:
+            self.eval_pending = True
+
+    def flush_pending(self):
+        if self.eval_pending and time.monotonic() - self.last_eval >= self.eval_period:
+            self.radar_loop()
+
+
+
+    # ingest thread'inden ya da decision timer'larından çağrılır
+    # başka thread değerlendiriyorsa beklemez, sıradaki flush turuna bırakır
     def radar_loop(self):
-        if self.my_pos is None or not self.targets:
+        if not self.eval_lock.acquire(blocking=False):
+            self.eval_pending = True
             return
+        try:
+            with self.lock:
+                self.evaluate()
+        finally:
+            self.eval_lock.release()
 
-        # hedef sec
-        if self.locked_target_id is None or self.locked_target_id not in self.targets:
-            best_target_id = None
-            min_hits = float('inf')
-            min_dist = float('inf') # Kriter değişikliği: Hizalanma yerine mesafe
 
-            for uav_id, target_obj in self.targets.items():
-                # last_position kontrolü (Sınıf tanımındadan dolayı ismi değişti)
-
-                if not target_obj.is_active(timeout=3.0):
-                    continue
 
+    def evaluate(self):
+        self.eval_pending = False
+        self.last_eval = time.monotonic()
+        if self.my_pos is None or not len(self.targets):
+            return
 
-                pos = target_obj.last_position 
-                if pos is None:
-                    continue
-                
-                # Mesafe Hesabı 
-                dx = pos.x - self.my_pos.x
-                dy = pos.y - self.my_pos.y
-                dz = pos.z - self.my_pos.z
-                dist = math.sqrt(dx**2 + dy**2 + dz**2)
-
-                # SEÇİM ---------------------------
-                # en az vurulan
-                if target_obj.hit_count < min_hits:
-                    min_hits = target_obj.hit_count
-                    min_dist = dist
-                    best_target_id = uav_id
-                
-                # en yakın olan
-                elif target_obj.hit_count == min_hits:
-                    if dist < min_dist:
-                        min_dist = dist
-                        best_target_id = uav_id
-                # SEÇİM ---------------------------/
+        now = time.time()
+        own_pos = np.array([self.my_pos.x, self.my_pos.y, self.my_pos.z])
 
+        # hedef sec: en az vurulan, eşitse en yakın (tüm tablo tek seferde)
+        if self.locked_target_id is None or self.locked_target_id not in self.targets:
+            best_target_id, min_dist = self.targets.select(own_pos, now, timeout=3.0, max_range=self.select_range,
+                                                           heading=self.my_pos.heading, min_alignment=self.select_min_alignment)
             if best_target_id:
                 self.locked_target_id = best_target_id
                 self.get_logger().info(f"Target locked: UAV_{self.locked_target_id} (Dist: {min_dist:.1f}m)")
@@ -180,66 +249,107 @@ class WSORadar(Node):
 
         # ------
         if self.locked_target_id and self.locked_target_id in self.targets:
-            target_obj = self.targets[self.locked_target_id]
 
             # kaybolan uçağın son verisini yayınlamaya devam edebiliriz  bu yüzden timout kontrolünü kullanıcaz ve 
-            if not target_obj.is_active(timeout=3.0):
+            if not self.targets.is_active(self.locked_target_id, now, timeout=3.0):
                 self.get_logger().warn(f"Lost track of UAV_{self.locked_target_id}! Breaking lock.")
                 self.locked_target_id = None
                 
                 # Weapons Hotı kapat 
-                hot_msg = Bool()
-                hot_msg.data = False
-                self.weapons_pub.publish(hot_msg)
+                self.publish_weapons(False)
                 return
 
 
 
-            target_msg = target_obj.last_position
+            #düşmaının konumuu yayınla------
+            # fighter 20 Hz'de okuyor, daha sık basmak boşa trafik (%10 pay: timer kayması yüzünden tur atlamasın)
+            if self.last_eval - self.last_target_pub >= 0.9 * self.target_period:
+                self.last_target_pub = self.last_eval
+                self.publish_target(*self.targets.state(self.locked_target_id, now)) # Koordinatları Pose olarak basar
+            #düşmaının konumuu yayınla------/
+
+            # mesafe hesaplarken irtifa katılmalı mı tartış
+
+            # Weapons Hot-------------------
+            # Hedef 100m yakınasa ve burn hedefe %40'den fazla dönükse kamera 120derce 1/3 ü olarak güncelleyebilirim 
+            # visiondaki çerçeve kontrolü eklenince önemi kalmaz 
+            # seçimle aynı ızgara sorgusu: 100 m'lik koni içindeki hedefler
+            rows, _, _ = self.targets.in_cone(own_pos, self.my_pos.heading, 100.0, 0.4, now)
+            is_hot = bool(self.targets.index[self.locked_target_id] in rows)
             
-            if target_msg:
-                #düşmaının konumuu yayınla------
-                self.publish_target(target_msg) # Koordinatları Pose olarak basar
-                #düşmaının konumuu yayınla------/
-
-                # mesafe hesaplarken irtifa katılmalı mı tartış
-
-                # Weapons Hot-------------------
-                dx = target_msg.x - self.my_pos.x
-                dy = target_msg.y - self.my_pos.y
-                dz = target_msg.z - self.my_pos.z
-                dist = math.sqrt(dx**2 + dy**2 + dz**2)
-   
-                angle_to_target = math.atan2(dy, dx)
-                alignment = math.cos(self.my_pos.heading - angle_to_target)
-
-                # Hedef 100m yakınasa ve burn hedefe %40'den fazla dönükse kamera 120derce 1/3 ü olarak güncelleyebilirim 
-                # visiondaki çerçeve kontrolü eklenince önemi kalmaz 
-                is_hot = bool(dist < 100.0 and alignment > 0.4)
-                
-                hot_msg = Bool()
-                hot_msg.data = is_hot
-                self.weapons_pub.publish(hot_msg)
-                # Weapons Hot-------------------/
+            self.publish_weapons(is_hot)
+            # Weapons Hot-------------------/
+
+
+
+    # sadece değişince ya da keepalive dolunca bas, kilit kırılma gibi durumlar hemen gider
+    # self.lock altında çağrılır
+    def publish_weapons(self, is_hot):
+        now = time.monotonic()
+        if is_hot == self.last_hot and now - self.last_hot_pub < self.weapons_keepalive:
+            return
+        self.last_hot = is_hot
+        self.last_hot_pub = now
 
+        hot_msg = Bool()
+        hot_msg.data = is_hot
+        self.weapons_pub.publish(hot_msg)
 
 
-    #düşman konumunu yayınla
-    def publish_target(self, target_msg):
+
+    #düşman konumunu yayınla: filtrenin şimdiki zamana taşıdığı konum, fighter hedefin şu an olduğu yere gitsin
+    def publish_target(self, target_pos, target_vel, pos_var, vel_var):
         p = Pose()
-        p.position.x = float(target_msg.x)
-        p.position.y = float(target_msg.y)
-        p.position.z = float(target_msg.z)
+        p.position.x = float(target_pos[0])
+        p.position.y = float(target_pos[1])
+        p.position.z = float(target_pos[2])
         self.hedef_pub.publish(p)
 
+        odom = Odometry()
+        odom.header.stamp = self.get_clock().now().to_msg()
+        odom.header.frame_id = 'ned'
+        odom.child_frame_id = f"uav_{self.locked_target_id}"
+        odom.pose.pose.position = p.position
+        odom.pose.pose.orientation.w = 1.0
+        odom.twist.twist.linear.x = float(target_vel[0])
+        odom.twist.twist.linear.y = float(target_vel[1])
+        odom.twist.twist.linear.z = float(target_vel[2])
+        # 6x6 satır sıralı, sadece konum/hız köşegeni dolu, yönelim bilinmiyor
+        pose_cov = [0.0] * 36
+        twist_cov = [0.0] * 36
+        for i in range(3):
+            pose_cov[i * 7] = float(pos_var[i])
+            twist_cov[i * 7] = float(vel_var[i])
+            pose_cov[(i + 3) * 7] = -1.0
+            twist_cov[(i + 3) * 7] = -1.0
+        odom.pose.covariance = pose_cov
+        odom.twist.covariance = twist_cov
+        self.state_pub.publish(odom)
+
+
+
 
 
+def make_executor(node):
+    threads = node.get_parameter('executor_threads').value
+    if threads <= 1:
+        return SingleThreadedExecutor()
+    return MultiThreadedExecutor(num_threads=threads)
 
 
 def main(args=None):
     rclpy.init(args=args)
-    rclpy.spin(WSORadar())
-    rclpy.shutdown()
+    radar = WSORadar()
+    executor = make_executor(radar)
+    executor.add_node(radar)
+    try:
+        executor.spin()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown()
+        radar.destroy_node()
+        rclpy.shutdown()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
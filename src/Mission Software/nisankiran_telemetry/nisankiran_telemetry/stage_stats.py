@@ -0,0 +1,50 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+
+# vision hattının aşama aşama gecikme ölçümü (monotonic saat)
+# her aşama için son N örnek tutulur, p50/p95/p99 bunlardan hesaplanır
+class StageStats:
+    def __init__(self, window=300):
+        self.window = window
+        self.samples = {}
+        self.totals = {}
+        self.lock = threading.Lock() # inference, HUD ve diagnostics thread'leri aynı anda yazıp okuyor
+
+    def record(self, stage, seconds):
+        with self.lock:
+            samples = self.samples.get(stage)
+            if samples is None:
+                samples = self.samples[stage] = deque(maxlen=self.window)
+                self.totals[stage] = 0
+            samples.append(seconds)
+            self.totals[stage] += 1
+
+    @contextmanager
+    def measure(self, stage):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - t0)
+
+    # stage -> (p50, p95, p99, toplam örnek) milisaniye
+    def summary(self):
+        with self.lock:
+            snapshot = {stage: (list(s), self.totals[stage]) for stage, s in self.samples.items() if s}
+
+        out = {}
+        for stage, (samples, total) in snapshot.items():
+            p50, p95, p99 = np.percentile(np.asarray(samples) * 1000.0, (50, 95, 99))
+            out[stage] = (float(p50), float(p95), float(p99), total)
+        return out
+
+    def format(self):
+        lines = [f"{'stage':<12}{'p50':>9}{'p95':>9}{'p99':>9}{'n':>8}"]
+        for stage, (p50, p95, p99, n) in self.summary().items():
+            lines.append(f"{stage:<12}{p50:>9.2f}{p95:>9.2f}{p99:>9.2f}{n:>8}")
+        return "\n".join(lines)
@@ -0,0 +1,277 @@
+import math
+
+import numpy as np
+
+from .track_history import TrackHistory
+
+
+# düşman uçak tablosu, struct-of-arrays: her alan tek numpy dizisi, her uçak bir satır
+# radar döngüsü uçak başına python döngüsü yerine tüm tabloyu tek seferde hesaplar
+# satırlar önceden ayrılır, dolarsa iki katına büyür, silinen satır tekrar kullanılır
+# ROS'tan bağımsız, benchmark doğrudan bunu çalıştırır
+#
+# her hedefte sabit hızlı Kalman filtresi: konum ve hız (vx, vy, vz) ölçümleri birlikte işlenir
+# eksenler bağımsız, her eksen 2x2 kovaryans (p00 konum, p01 konum-hız, p11 hız), bbox_filter ile aynı düzen
+# hedef güncellemesi seyrek/düzensiz gelse de (yarışma sunucusu ~1 Hz) her an için şimdiki konum tahmin edilir
+#
+# yatay düzlemde düzgün ızgara indeksi: hücre -> satırlar, uçak hücre değiştirince taşınır
+# menzil / görüş konisi sorguları sadece yakın hücrelere bakar, iş filo boyutuyla değil yakındaki trafikle büyür
+#
+# her satırın ham ölçüm geçmişi TrackHistory'de (sabit kapasiteli halka), son N saniye history() ile
+class TargetTable:
+    def __init__(self, capacity=64, accel_std=3.0, pos_std=1.0, vel_std=0.5, max_extrapolation=2.0,
+                 cell_size=250.0, index_margin=100.0, history_len=256):
+        self.q = accel_std ** 2     # ivme gürültüsü (m/s^2)^2, manevra payı
+        self.r_pos = pos_std ** 2   # konum ölçüm gürültüsü m^2
+        self.r_vel = vel_std ** 2   # hız ölçüm gürültüsü (m/s)^2
+        self.max_extrapolation = max_extrapolation # bundan uzun süre ileri taşınmaz, eski veri uçup gitmesin
+        self.cell_size = cell_size
+        # ızgara son ölçüm konumunu tutar, tahmin edilen konum ondan bu kadar uzaklaşabilir (~50 m/s * 2 sn)
+        self.index_margin = index_margin
+        self.grid = {}  # (ix, iy) -> set(satır)
+        self.cells = {} # satır -> (ix, iy)
+        self.history_len = history_len # hedef başına örnek, 50 Hz'de ~5 sn, 1 Hz sunucuda ~4 dk
+
+        self.index = {} # uav_id -> satır
+        self.ids = []   # satır -> uav_id (boş satır None)
+        self.free = []
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        old = len(self.ids)
+        pos = np.zeros((capacity, 3))
+        vel = np.zeros((capacity, 3))
+        p00 = np.zeros((capacity, 3))
+        p01 = np.zeros((capacity, 3))
+        p11 = np.zeros((capacity, 3))
+        last_seen = np.full(capacity, -np.inf)
+        hit_count = np.zeros(capacity, dtype=np.int64)
+        used = np.zeros(capacity, dtype=bool)
+        if old:
+            pos[:old] = self.pos
+            vel[:old] = self.vel
+            p00[:old] = self.p00
+            p01[:old] = self.p01
+            p11[:old] = self.p11
+            last_seen[:old] = self.last_seen
+            hit_count[:old] = self.hit_count
+            used[:old] = self.used
+            self.tracks.grow(capacity)
+        else:
+            self.tracks = TrackHistory(capacity, self.history_len)
+
+        self.pos = pos             # filtrelenmiş NED konum (m), last_seen anında
+        self.vel = vel             # filtrelenmiş NED hız (m/s)
+        self.p00 = p00
+        self.p01 = p01
+        self.p11 = p11
+        self.last_seen = last_seen # son mesajın geliş zamanı (time.time()), filtre zamanı
+        self.hit_count = hit_count
+        self.used = used
+        self.ids.extend([None] * (capacity - old))
+        self.free.extend(range(capacity - 1, old - 1, -1)) # küçük satırlar önce dolsun
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, uav_id):
+        return uav_id in self.index
+
+    @property
+    def capacity(self):
+        return len(self.ids)
+
+    # yeni uçaksa satır aç, ölçümü filtreye ve geçmişe işle
+    # geçersiz bileşen NaN (PX4 xy_valid/z_valid/v_xy_valid/v_z_valid), o eksende o ölçüm atlanır, vel None: hız yok
+    # yeni uçak tam konumla açılır, konumu eksikse None döner
+    def update(self, uav_id, pos, vel, t, heading=np.nan):
+        pos = np.asarray(pos, dtype=float)
+        vel = np.full(3, np.nan) if vel is None else np.asarray(vel, dtype=float)
+        pos_ok, vel_ok = np.isfinite(pos), np.isfinite(vel)
+
+        row = self.index.get(uav_id)
+        if row is None:
+            if not pos_ok.all():
+                return None
+            if not self.free:
+                self._alloc(self.capacity * 2)
+            row = self.free.pop()
+            self.index[uav_id] = row
+            self.ids[row] = uav_id
+            self.hit_count[row] = 0
+            self.used[row] = True
+            self.tracks.clear(row)
+            self.tracks.append(row, t, pos, vel, heading)
+            self._init(row, pos, vel, vel_ok, t)
+            self._reindex(row)
+            return row
+        if not (pos_ok.any() or vel_ok.any()):
+            return row
+
+        self.tracks.append(row, t, pos, vel, heading)
+        x, v, p00, p01, p11 = self._propagate(row, max(t - self.last_seen[row], 0.0))
+        y = np.where(pos_ok, pos - x, 0.0)
+        yv = np.where(vel_ok, vel - v, 0.0)
+        # eksen başına 2x2 kapalı form: K = P S^-1, P = (I - K) P
+        # tek ölçümlü eksende S skaler, olmayan ölçümün kazancı sıfır
+        s00, s01, s11 = p00 + self.r_pos, p01, p11 + self.r_vel
+        det = s00 * s11 - s01 * s01
+        both = pos_ok & vel_ok
+        k00 = np.where(both, (p00 * s11 - p01 * s01) / det, np.where(pos_ok, p00 / s00, 0.0))
+        k01 = np.where(both, (p01 * s00 - p00 * s01) / det, np.where(vel_ok, p01 / s11, 0.0))
+        k10 = np.where(both, (p01 * s11 - p11 * s01) / det, np.where(pos_ok, p01 / s00, 0.0))
+        k11 = np.where(both, (p11 * s00 - p01 * s01) / det, np.where(vel_ok, p11 / s11, 0.0))
+        x = x + k00 * y + k01 * yv
+        v = v + k10 * y + k11 * yv
+        p00, p01, p11 = ((1.0 - k00) * p00 - k01 * p01,
+                         (1.0 - k00) * p01 - k01 * p11,
+                         (1.0 - k11) * p11 - k10 * p01)
+
+        self.pos[row], self.vel[row] = x, v
+        self.p00[row], self.p01[row], self.p11[row] = p00, p01, p11
+        self.last_seen[row] = t
+        self._reindex(row)
+        return row
+
+    def _cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    # satırın hücresi değiştiyse taşı
+    def _reindex(self, row):
+        cell = self._cell(self.pos[row, 0], self.pos[row, 1])
+        old = self.cells.get(row)
+        if old == cell:
+            return
+        if old is not None:
+            self._unindex(row)
+        self.cells[row] = cell
+        self.grid.setdefault(cell, set()).add(row)
+
+    def _unindex(self, row):
+        cell = self.cells.pop(row, None)
+        if cell is None:
+            return
+        rows = self.grid[cell]
+        rows.discard(row)
+        if not rows:
+            del self.grid[cell]
+
+    def _init(self, row, pos, vel, vel_ok, t):
+        self.pos[row] = pos
+        self.vel[row] = np.where(vel_ok, vel, 0.0)
+        self.p00[row] = self.r_pos
+        self.p01[row] = 0.0
+        self.p11[row] = np.where(vel_ok, self.r_vel, 400.0) # hız bilinmiyorsa 20 m/s belirsizlik
+        self.last_seen[row] = t
+
+    # satırın dt kadar ileri taşınmış (konum, hız, p00, p01, p11), durumu değiştirmez
+    def _propagate(self, row, dt):
+        q = self.q
+        pos = self.pos[row] + self.vel[row] * dt
+        p00 = self.p00[row] + dt * (2.0 * self.p01[row] + dt * self.p11[row]) + q * dt ** 4 / 4.0
+        p01 = self.p01[row] + dt * self.p11[row] + q * dt ** 3 / 2.0
+        p11 = self.p11[row] + q * dt ** 2
+        return pos, self.vel[row].copy(), p00, p01, p11
+
+    # tüm satırların now anına taşınmış konumu (boş satırlar da hesaplanır, used ile maskelenir)
+    def predicted_positions(self, now):
+        dt = np.clip(now - self.last_seen, 0.0, self.max_extrapolation)
+        return self.pos + self.vel * dt[:, None]
+
+    # tek hedefin now anındaki (konum, hız, konum varyansı, hız varyansı), eksen başına
+    def state(self, uav_id, now):
+        row = self.index[uav_id]
+        dt = min(max(now - self.last_seen[row], 0.0), self.max_extrapolation)
+        pos, vel, p00, _, p11 = self._propagate(row, dt)
+        return pos, vel, p00, p11
+
+    # son seconds saniyenin ham örnekleri eskiden yeniye: (t, konum, hız, heading), geçersiz bileşenler NaN
+    def history(self, uav_id, seconds=None, now=None):
+        row = self.index[uav_id]
+        since = -np.inf if seconds is None else (self.last_seen[row] if now is None else now) - seconds
+        samples = self.tracks.window(row, since)
+        return samples[:, 0], samples[:, 1:4], samples[:, 4:7], samples[:, 7]
+
+    def remove(self, uav_id):
+        row = self.index.pop(uav_id, None)
+        if row is None:
+            return
+        self._unindex(row)
+        self.ids[row] = None
+        self.used[row] = False
+        self.last_seen[row] = -np.inf
+        self.free.append(row)
+
+    def hit(self, uav_id):
+        row = self.index.get(uav_id)
+        if row is not None:
+            self.hit_count[row] += 1
+
+    def is_active(self, uav_id, now, timeout=3.0):
+        row = self.index.get(uav_id)
+        return row is not None and now - self.last_seen[row] < timeout
+
+    # ızgaradan aday satırlar: merkeze yatayda radius (+ pay) içindeki hücreler
+    def _candidates(self, center, radius):
+        r = radius + self.index_margin
+        x0, y0 = self._cell(center[0] - r, center[1] - r)
+        x1, y1 = self._cell(center[0] + r, center[1] + r)
+        rows = []
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.grid):
+            # sorgu hücre sayısı dolu hücrelerden fazla: dolu hücreleri gez
+            for (ix, iy), cell_rows in self.grid.items():
+                if x0 <= ix <= x1 and y0 <= iy <= y1:
+                    rows.extend(cell_rows)
+        else:
+            for ix in range(x0, x1 + 1):
+                for iy in range(y0, y1 + 1):
+                    rows.extend(self.grid.get((ix, iy), ()))
+        return np.array(rows, dtype=np.intp)
+
+    # now anında own_pos'a radius içindeki aktif hedefler: (satırlar, mesafeler, fark vektörleri)
+    def in_range(self, own_pos, radius, now, timeout=3.0):
+        rows = self._candidates(own_pos, radius)
+        if not len(rows):
+            return rows, np.zeros(0), np.zeros((0, 3))
+        dt = np.clip(now - self.last_seen[rows], 0.0, self.max_extrapolation)
+        d = self.pos[rows] + self.vel[rows] * dt[:, None] - own_pos
+        dist = np.sqrt(np.einsum('ij,ij->i', d, d))
+        keep = (dist <= radius) & (now - self.last_seen[rows] < timeout)
+        return rows[keep], dist[keep], d[keep]
+
+    # görüş konisi: radius içinde ve burnun hedefe dönüklüğü cos(heading - kerteriz) >= min_alignment
+    # (satırlar, mesafeler, hizalanmalar)
+    def in_cone(self, own_pos, heading, radius, min_alignment, now, timeout=3.0):
+        rows, dist, d = self.in_range(own_pos, radius, now, timeout)
+        alignment = np.cos(heading - np.arctan2(d[:, 1], d[:, 0]))
+        keep = alignment > min_alignment
+        return rows[keep], dist[keep], alignment[keep]
+
+    # en az vurulan, eşitse en yakın aktif hedef: (uav_id, mesafe), yoksa (None, None)
+    # max_range verilirse sadece o menzildeki adaylar puanlanır, heading de verilirse sadece geniş görüş konisindekiler
+    # menzilde kimse yoksa menzil ikiye katlanır, sorgu tüm dolu hücreleri kapsayınca tüm tablo (koni de kalkar)
+    def select(self, own_pos, now, timeout=3.0, max_range=None, heading=None, min_alignment=-0.5):
+        radius = max_range
+        while radius is not None:
+            if heading is None:
+                rows, dist, _ = self.in_range(own_pos, radius, now, timeout)
+            else:
+                rows, dist, _ = self.in_cone(own_pos, heading, radius, min_alignment, now, timeout)
+            if len(rows):
+                hits = self.hit_count[rows]
+                best = np.flatnonzero(hits == hits.min())
+                best = best[np.argmin(dist[best])]
+                return self.ids[rows[best]], float(dist[best])
+            cells = (2.0 * (radius + self.index_margin) / self.cell_size + 1.0) ** 2
+            radius = radius * 2.0 if cells < len(self.grid) else None
+
+        active = self.used & (now - self.last_seen < timeout)
+        if not active.any():
+            return None, None
+
+        d = self.predicted_positions(now) - own_pos
+        dist = np.einsum('ij,ij->i', d, d)
+        hits = np.where(active, self.hit_count, np.iinfo(np.int64).max)
+        dist[hits != hits.min()] = np.inf
+        row = int(np.argmin(dist))
+        return self.ids[row], float(np.sqrt(dist[row]))
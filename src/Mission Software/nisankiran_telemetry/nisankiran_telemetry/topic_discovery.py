@@ -0,0 +1,102 @@
+import re
+import time
+
+
+# uçak topiclerini kendiliğinden bul, yenisine abone ol, yok olana ait aboneliği kaldır
+# WSORadar ve FakeServerNode ortak kullanır
+# rclpy graph olaylarını python'a açmıyor, o yüzden kısa aralıklı ama ucuz yoklama:
+# get_topic_names_and_types node'un kendi discovery önbelleğinden okur, isim kümesi değişmediyse tarama yapılmaz
+# kendi aboneliğimiz topici grafikte tuttuğu için yayıncının gelip gitmesi isim kümesini değiştirmez,
+# yayıncı sayıları ayrı ve daha seyrek bir timer'da sayılır
+
+
+# px4_2 -> id '2'
+DEFAULT_POSITION_PATTERN = r'/px4_(?P<id>\d+)/fmu/out/vehicle_local_position(_v\d+)?'
+
+
+class TopicDiscovery:
+    # on_added(topic, match) -> subscription, on_removed(topic, match)
+    # grace: yayıncısı bu kadar saniye yoksa topic gitmiş sayılır (PX4 agent yeniden bağlanırken kısa kopmalar olabilir)
+    # liveness_period: yayıncı sayımı aralığı, grace'ten kısa olmalı
+    # callback_group: iki timer'ın grubu, on_added/on_removed de o grupta çalışır
+    def __init__(self, node, pattern, type_name, on_added, on_removed=None, period=0.5, grace=3.0, liveness_period=1.0, callback_group=None):
+        self.node = node
+        self.regex = re.compile(pattern)
+        self.type_name = type_name
+        self.on_added = on_added
+        self.on_removed = on_removed
+        self.grace = grace
+
+        self.names = frozenset() # son taramadaki topic isimleri
+        self.active = {}     # topic -> (subscription, match)
+        self.pending = {}    # desene ve tipe uyan ama yayıncısı olmayan topic -> match
+        self.ignored = set() # desene uymayan topicler, grafikten çıkana kadar tekrar bakılmaz
+        self.lost_since = {} # topic -> yayıncısız kaldığı ilk an
+
+        self.timer = node.create_timer(period, self.poll, callback_group=callback_group)
+        self.liveness_timer = node.create_timer(liveness_period, self.check_publishers, callback_group=callback_group)
+        self.poll()
+
+    def poll(self):
+        graph = self.node.get_topic_names_and_types()
+        names = frozenset(name for name, _ in graph)
+        if names == self.names:
+            return
+
+        # graf küçüldüyse gidenler unutulur, ignored sınırsız büyümesin
+        if not names >= self.names:
+            self.ignored &= names
+            for name in [n for n in self.pending if n not in names]:
+                del self.pending[name]
+        self.names = names
+
+        for name, types in graph:
+            if name in self.active or name in self.pending or name in self.ignored:
+                continue
+
+            match = self.regex.fullmatch(name)
+            if match is None or self.type_name not in types:
+                self.ignored.add(name)
+                continue
+            # sadece abonesi kalmış eski topice tekrar abone olma, yayıncı gelirse check_publishers ekler
+            self.pending[name] = match
+            if self.node.count_publishers(name) > 0:
+                self.add(name, match)
+
+    def add(self, name, match):
+        try:
+            subscription = self.on_added(name, match)
+        except Exception as e:
+            self.node.get_logger().error(f"Subscription failed for {name}: {e}")
+            return
+        del self.pending[name]
+        self.active[name] = (subscription, match)
+
+    def check_publishers(self):
+        for name, match in list(self.pending.items()):
+            if self.node.count_publishers(name) > 0:
+                self.add(name, match)
+        self.remove_vanished()
+
+    def remove_vanished(self):
+        now = time.monotonic()
+        for name in list(self.active):
+            if self.node.count_publishers(name) > 0:
+                self.lost_since.pop(name, None)
+                continue
+
+            since = self.lost_since.setdefault(name, now)
+            if now - since < self.grace:
+                continue
+
+            subscription, match = self.active.pop(name)
+            self.lost_since.pop(name, None)
+            self.node.destroy_subscription(subscription)
+            # isim grafikte kalabilir (başka aboneler), yayıncı dönerse yeniden eklensin
+            self.pending[name] = match
+            if self.on_removed is not None:
+                self.on_removed(name, match)
+
+    # abone olunan topicler -> match
+    def topics(self):
+        return {name: match for name, (_, match) in self.active.items()}
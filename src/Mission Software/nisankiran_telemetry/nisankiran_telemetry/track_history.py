@@ -0,0 +1,49 @@
+import numpy as np
+
+
+# hedef başına sabit kapasiteli geçmiş, TargetTable satırlarıyla aynı indeks
+# tek numpy bloğu: (satır, örnek, alan), her satır kendi halka bufferı, görev ne kadar uzarsa uzasın bellek sabit
+# alanlar: t, x, y, z, vx, vy, vz, heading (ham ölçüm, filtrelenmemiş)
+T, POS, VEL, HEADING = 0, slice(1, 4), slice(4, 7), 7
+FIELDS = 8
+
+
+class TrackHistory:
+    def __init__(self, rows, length=256):
+        self.length = length
+        self.data = np.zeros((rows, length, FIELDS))
+        self.head = np.zeros(rows, dtype=np.intp)  # sıradaki yazılacak yer
+        self.count = np.zeros(rows, dtype=np.intp) # dolu örnek sayısı
+
+    def grow(self, rows):
+        old = len(self.head)
+        data = np.zeros((rows, self.length, FIELDS))
+        data[:old] = self.data
+        head = np.zeros(rows, dtype=np.intp)
+        count = np.zeros(rows, dtype=np.intp)
+        head[:old] = self.head
+        count[:old] = self.count
+        self.data, self.head, self.count = data, head, count
+
+    def clear(self, row):
+        self.head[row] = 0
+        self.count[row] = 0
+
+    def append(self, row, t, pos, vel, heading):
+        sample = self.data[row, self.head[row]]
+        sample[T] = t
+        sample[POS] = pos
+        sample[VEL] = vel
+        sample[HEADING] = heading
+        self.head[row] = (self.head[row] + 1) % self.length
+        self.count[row] = min(self.count[row] + 1, self.length)
+
+    # since'den sonraki örnekler eskiden yeniye, (n, FIELDS) kopya
+    def window(self, row, since=-np.inf):
+        n = self.count[row]
+        idx = (self.head[row] - n + np.arange(n)) % self.length
+        samples = self.data[row, idx]
+        return samples[np.searchsorted(samples[:, T], since):]
+
+    def memory(self):
+        return self.data.nbytes + self.head.nbytes + self.count.nbytes
@@ -4,20 +4,97 @@ os.environ["QT_LOGGING_RULES"] = "qt.qpa.fonts.warning=false;default.warning=fal
 
 import rclpy
 from rclpy.node import Node
-from sensor_msgs.msg import Image
+from sensor_msgs.msg import Image, CompressedImage
 from std_msgs.msg import Float32MultiArray, Bool
+from diagnostic_msgs.msg import DiagnosticArray, DiagnosticStatus, KeyValue
+from geometry_msgs.msg import Pose
+from px4_msgs.msg import VehicleLocalPosition, VehicleAttitude, VehicleAngularVelocity
+from vision_msgs.msg import Detection2DArray, Detection2D, ObjectHypothesisWithPose
 from cv_bridge import CvBridge
 import cv2
-from ultralytics import YOLO
 from rclpy.qos import QoSProfile, ReliabilityPolicy, DurabilityPolicy
-from nisankiran_interfaces.srv import TargetKill
+from nisankiran_interfaces.srv import TargetKill, LoadModel
+import threading
+import time
+import array
+from dataclasses import fields, replace
+
+from .frame_slot import LatestFrameSet
+from .backends import create_backend
+from .hud import HudState, HudRenderer
+from .image_io import image_to_bgr, BufferPool
+from .lock_timer import LOCK_NONE, LOCK_KILL
+from .bbox_filter import BboxKalman
+from .blackbox import BlackBoxRecorder
+from .ego_motion import EgoMotion
+from .decode_pool import OrderedDecodePool, decode_compressed
+from .stage_stats import StageStats
+from .vision_pipeline import PipelineConfig, VisionPipeline, run_detect_jobs
+from .detection import make_tiles
+
+
+# isimli kameranın topicleri kendi namespace'inde, isimsiz kamera eski kök topicleri kullanır
+def camera_topic(name, topic):
+    return f"/{name}{topic}" if name else topic
+
+
+# /enemy_bbox: [cx, cy, w, h, kilit durumu, cx std, cy std, son tespitten beri geçen s], hedef yoksa NO_TARGET
+# std: Kalman konum belirsizliği piksel (1 sigma), tespit gelmedikçe büyür
+NO_TARGET = (-1.0, -1.0, 0.0, 0.0, LOCK_NONE, -1.0, -1.0, -1.0)
+
+
+# kamera başına durum: kendi pipeline'ı (takip, arama penceresi, kilit sayacı), bbox filtresi, yayıncıları
+class CameraStream:
+    def __init__(self, name, topic, pipeline, kalman):
+        self.name = name
+        self.topic = topic
+        self.pipeline = pipeline
+        self.frame_index = 0
+        self.size_checked = False # ilk karede ısınma boyu kontrolü
+
+        # inference thread'i günceller, bbox zamanlayıcısı okur
+        # filtre kamera damgası saatinde, damga - alış (monotonic) farkı ile zamanlayıcı şimdiki anı o saate çevirir
+        # (Gazebo köprüsü sim saati basar, node saati duvar saati: ikisi karışırsa yaş ~1e9 sn çıkar)
+        self.kalman = kalman
+        self.stamp_offset = None
+        self.lock_status = LOCK_NONE
+        self.filter_lock = threading.Lock()
+
+        self.recorder = None # kara kutu, açıksa
+        self.was_locking = False
+
+        # her karede yeni mesaj ayırma, aynı nesnenin verisini yerinde güncelle
+        self.bbox_msg = Float32MultiArray()
+        self.bbox_msg.data = array.array('f', NO_TARGET)
+        self.bbox_pub = None
+        self.detections_pub = None
 
 class VisionTracker(Node):
     def __init__(self):
         super().__init__('vision_tracker_node')
         self.get_logger().info("[VISION] Module initialized with high tolerance.")
 
-        self.model = YOLO('/home/federstation/nisankiran_ws/best.pt')# model yolu
+        # inference arka ucu parametreyle seçilir: ultralytics | onnxruntime | opencv
+        # model_path boşsa arka ucun varsayılan yolu (best.pt / best.onnx), precision int8 ise *_int8.onnx
+        self.declare_parameter('backend', 'ultralytics')
+        self.declare_parameter('model_path', '')
+        self.declare_parameter('precision', 'fp32')
+        self.declare_parameter('device', '') # boş: otomatik, 'cpu' ya da 'cuda:0'
+        self.declare_parameter('imgsz', 640)
+        self.declare_parameter('warmup_iters', 3) # hazır demeden önce her batch/giriş boyu için boş inference sayısı
+
+        self.backend = create_backend(
+            self.get_parameter('backend').value,
+            self.get_parameter('model_path').value,
+            self.get_parameter('precision').value,
+            self.get_parameter('device').value,
+            self.get_parameter('imgsz').value,
+        )
+        self.get_logger().info(f"[VISION] Backend: {self.backend.name} ({self.backend.model_path})")
+
+        # aşama gecikmeleri: decode, preprocess, inference, postprocess, track, select, publish, hud, total, frame_age, queue_age
+        self.stats = StageStats()
+        self.backend.stats = self.stats
         self.bridge = CvBridge()
 
 
@@ -42,32 +119,216 @@ class VisionTracker(Node):
 
         # gz ros bridge gerekiyo her seferinde
         # kamera yolu 
-        self.subscription = self.create_subscription(Image,'/world/default/model/rc_cessna_1/link/base_link/sensor/camera/image',self.image_callback,qos_camera)# 10 u kaldırdım yeni profil uyguladım. kamera için 10 görüntü tutmaya gerek yok jetsonu yormasın Son parametre Qos profile | int Eski(profil 10 :Keep last 10 depth reliable)
-            
+        # birden fazla kamera (dar açılı takip + geniş açı): her kameranın en taze karesi tek model çağrısında işlenir
+        # camera_names: boş isim eski kök topicler (/enemy_bbox), isimli kamera /<isim>/enemy_bbox
+        self.declare_parameter('camera_topics', ['/world/default/model/rc_cessna_1/link/base_link/sensor/camera/image'])
+        self.declare_parameter('camera_names', [''])
+        self.declare_parameter('camera_batch_wait', 0.005) # ilk kare geldikten sonra diğer kameraları en fazla bu kadar saniye bekle
+        # raw: sensor_msgs/Image, compressed: sensor_msgs/CompressedImage (jpeg/png), Rocket AC5 UDP linki için
+        self.declare_parameter('camera_transport', 'raw')
+        self.declare_parameter('decode_workers', 2) # sıkıştırılmış kareleri çözen thread sayısı
+        # kamera çözünürlüğü (genişlik, yükseklik), ısınma gerçek kare ve parça boylarıyla yapılsın diye
+        self.declare_parameter('camera_resolution', [1280, 720])
+
+        camera_topics = list(self.get_parameter('camera_topics').value)
+        camera_names = list(self.get_parameter('camera_names').value)
+        if len(camera_names) != len(camera_topics) or len(set(camera_names)) != len(camera_names):
+            camera_names = [''] if len(camera_topics) == 1 else [f"cam{i}" for i in range(len(camera_topics))]
+            self.get_logger().warn(f"[VISION] camera_names does not match camera_topics, using {camera_names}")
+        self.camera_batch_wait = self.get_parameter('camera_batch_wait').value
+
 
         #kamera görüntüsü best effort olmalı 
         self.weapons_hot_sub = self.create_subscription(Bool, '/weapons_hot', self.weapons_hot_cb, qos_reliable)
 
 
-        self.bbox_pub = self.create_publisher(Float32MultiArray, '/enemy_bbox', 10)
-        self.kill_client = self.create_client(TargetKill, 'confirm_kill')
+        # arama penceresi için radarın kilitli hedefi ve kendi konum/duruşumuz
+        qos_fast_telemetry = QoSProfile(
+            reliability=ReliabilityPolicy.BEST_EFFORT,
+            durability=DurabilityPolicy.VOLATILE,
+            history=rclpy.qos.HistoryPolicy.KEEP_LAST,
+            depth=1
+        )
+        self.declare_parameter('own_position_topic', '/px4_1/fmu/out/vehicle_local_position_v1') # PX4 sürümlü topic, fighter/controller da _v1 dinliyor
+        self.declare_parameter('own_attitude_topic', '/px4_1/fmu/out/vehicle_attitude')
+
+        self.locked_target_sub = self.create_subscription(Pose, '/locked_target', self.locked_target_cb, qos_reliable)
+        self.own_pos_sub = self.create_subscription(VehicleLocalPosition, self.get_parameter('own_position_topic').value, self.own_pos_cb, qos_fast_telemetry)
+        self.own_att_sub = self.create_subscription(VehicleAttitude, self.get_parameter('own_attitude_topic').value, self.own_att_cb, qos_fast_telemetry)
 
+        # ego hareket telafisi: kare anındaki duruş, duruş geçmişi + açısal hızla bulunur
+        self.declare_parameter('own_angular_velocity_topic', '/px4_1/fmu/out/vehicle_angular_velocity')
+        self.ego = EgoMotion()
+        self.own_rate_sub = self.create_subscription(VehicleAngularVelocity, self.get_parameter('own_angular_velocity_topic').value, self.own_rate_cb, qos_fast_telemetry)
+
+
+        self.kill_client = self.create_client(TargetKill, 'confirm_kill')
 
 
-        self.lock_frames = 0#kilitliyken
-        self.lost_frames = 0#kilitlenememe timoutu
 
-        self.REQUIRED_FRAMES_FOR_KILL = 120 # sayaç yarışma için kilitlenme süresini 5sn yapıcaz şuan 4 civarı
-        self.MAX_TOLERANCE_FRAMES = 35 # yaklaşık 1 saniye kayıp payı (35 kare yaptım) biraz düşebilir
         self.is_weapons_hot = False
 
 
+        # tespit / takip / arama penceresi / kilit ayarları PipelineConfig'te, her alan aynı isimle ROS parametresi
+        # kilit süresi kare zaman damgasıyla (msg.header.stamp) ölçülür, FPS değişse de yarışmadaki kilit süresi kaymaz
+        config = PipelineConfig()
+        for f in fields(PipelineConfig):
+            self.declare_parameter(f.name, getattr(config, f.name))
+            setattr(config, f.name, self.get_parameter(f.name).value)
+        self.config = config
+
+
+        # /enemy_bbox inference bitince değil, Kalman tahminiyle sabit hızda basılır (0: her inference sonrası)
+        # guidance 10 Hz tespitte de düzenli aralıklı, düşük gecikmeli girdi alır
+        self.declare_parameter('bbox_rate_hz', 50.0)
+        self.declare_parameter('bbox_accel_std', 150.0) # px/s^2, hedefin görüntüde ne kadar sert manevra yapabileceği
+        self.declare_parameter('bbox_meas_std', 4.0)    # px, tespit kutusunun titremesi
+        self.declare_parameter('bbox_max_coast', 0.5)   # s, bu kadar tespit gelmezse hedef yok bas
+        self.bbox_rate_hz = self.get_parameter('bbox_rate_hz').value
+        self.bbox_max_coast = self.get_parameter('bbox_max_coast').value
+
+        # kamera başına ayrı pipeline (takip ve kilit durumu kameraya özel), model ortak
+        # isimli kameranın görüş açısı ve eğimi <isim>.camera_hfov_deg / <isim>.camera_pitch_deg ile ayrı verilebilir
+        self.cameras = {}
+        for name, topic in zip(camera_names, camera_topics):
+            cam_config = config
+            if name:
+                self.declare_parameter(f"{name}.camera_hfov_deg", config.camera_hfov_deg)
+                self.declare_parameter(f"{name}.camera_pitch_deg", config.camera_pitch_deg)
+                cam_config = replace(config,
+                    camera_hfov_deg=self.get_parameter(f"{name}.camera_hfov_deg").value,
+                    camera_pitch_deg=self.get_parameter(f"{name}.camera_pitch_deg").value)
+
+            kalman = BboxKalman(self.get_parameter('bbox_accel_std').value, self.get_parameter('bbox_meas_std').value)
+            cam = CameraStream(name, topic, VisionPipeline(self.backend, cam_config, self.stats), kalman)
+            cam.bbox_pub = self.create_publisher(Float32MultiArray, camera_topic(name, '/enemy_bbox'), 10)
+            cam.detections_pub = self.create_publisher(Detection2DArray, camera_topic(name, '/enemy_detections'), 10) # eşiği geçen tüm tespitler
+            self.cameras[name] = cam
+            self.get_logger().info(f"[VISION] Camera '{name or 'default'}': {topic} -> {camera_topic(name, '/enemy_bbox')}")
+        self.target_classes = next(iter(self.cameras.values())).pipeline.target_classes
+
+
+        # kamera callback'i sadece en son kareyi bırakır, inference ayrı thread'de döner
+        # yavaş bir inference executor'u kitleyip /weapons_hot ve kill servisini geciktirmesin
+        # kutudaki öğe (msg, kare, alış zamanı): raw'da kare None, inference thread'i çözer. compressed'da havuz çözüp sırayla bırakır
+        # alış zamanı callback'teki time.monotonic(), kamera damgası başka saatte olabilir
+        self.frame_set = LatestFrameSet(self.cameras)
+        self.decode_pool = None
+        msg_type = Image
+        if self.get_parameter('camera_transport').value == 'compressed':
+            msg_type = CompressedImage
+            self.decode_pool = OrderedDecodePool(
+                lambda name, msg, frame, received: self.frame_set.put(name, (msg, frame, received)),
+                self.get_parameter('decode_workers').value, self.stats)
+        for name, cam in self.cameras.items():
+            # 10 u kaldırdım yeni profil uyguladım. kamera için 10 görüntü tutmaya gerek yok jetsonu yormasın
+            self.create_subscription(msg_type, cam.topic, lambda msg, name=name: self.image_callback(msg, name), qos_camera)
+
+        # sıcak döngü bufferları: rgb8 dönüşümü için kamera başına 3'lü halka (HUD thread'i bir önceki kareyi okurken üstüne yazılmasın)
+        self.buffers = BufferPool()
+
+        # HUD----------
+        # headless: uçakta ekran yok, pencere açılmaz ve hiç çizim yapılmaz
+        # hud_publish: overlay arka planda sınırlı hızda çizilir, küçültülüp GCS'ye jpeg olarak basılır
+        self.declare_parameter('headless', False)
+        self.declare_parameter('hud_publish', False)
+        self.declare_parameter('hud_rate_hz', 10.0)
+        self.declare_parameter('hud_scale', 0.5)
+        self.declare_parameter('hud_jpeg_quality', 70)
+        self.declare_parameter('hud_camera', camera_names[0]) # HUD tek kameradan çizilir
+
+        self.headless = self.get_parameter('headless').value
+        self.hud_publish = self.get_parameter('hud_publish').value
+        self.hud_jpeg_quality = self.get_parameter('hud_jpeg_quality').value
+        self.hud_camera = self.get_parameter('hud_camera').value
+
+        self.hud_frame = None
+        self.hud_lock = threading.Lock() # thread çakışmasını önlemek için kilit
+        self.hud = None
+        if self.hud_publish:
+            self.hud_pub = self.create_publisher(CompressedImage, '/vision/hud/compressed', qos_camera)
+        if self.hud_publish or not self.headless:
+            self.hud = HudRenderer(self.on_hud_frame, self.get_parameter('hud_rate_hz').value, self.get_parameter('hud_scale').value, self.stats)
+
+        # imshow ana thread'de kalsın, yaklaşık 30 FPS
+        if not self.headless:
+            self.create_timer(0.033, self.display_callback)
+        # HUD----------/
+
+        # kara kutu: kilit kırılınca ve vuruşta olay öncesi/sonrası kareler diske, kamera başına ayrı klasör
+        self.declare_parameter('blackbox_enabled', False)
+        self.declare_parameter('blackbox_dir', '~/nisankiran_blackbox')
+        self.declare_parameter('blackbox_seconds_before', 5.0)
+        self.declare_parameter('blackbox_seconds_after', 3.0)
+        self.declare_parameter('blackbox_max_mb', 64.0) # kamera başına bellek sınırı
+        self.declare_parameter('blackbox_jpeg_quality', 80)
+        self.declare_parameter('blackbox_fps', 15.0) # kaydedilen kare hızı, jpeg sıkıştırma CPU'su bununla sınırlı
+        if self.get_parameter('blackbox_enabled').value:
+            for name, cam in self.cameras.items():
+                cam.recorder = BlackBoxRecorder(
+                    self.get_parameter('blackbox_dir').value,
+                    lambda msg, name=name: self.decode_blackbox(name, msg),
+                    self.get_parameter('blackbox_seconds_before').value,
+                    self.get_parameter('blackbox_seconds_after').value,
+                    int(self.get_parameter('blackbox_max_mb').value * 1024 * 1024),
+                    self.get_parameter('blackbox_jpeg_quality').value,
+                    self.get_parameter('blackbox_fps').value,
+                    name,
+                )
+            self.get_logger().info(f"[VISION] Black box recording to {self.get_parameter('blackbox_dir').value}")
+        self.create_timer(5.0, self.log_frame_stats)
+        if self.bbox_rate_hz > 0:
+            self.create_timer(1.0 / self.bbox_rate_hz, self.publish_bbox_predictions)
+
+        # p50/p95/p99 gecikmeler 1 Hz /diagnostics'e
+        self.diag_pub = self.create_publisher(DiagnosticArray, '/diagnostics', 10)
+        self.create_timer(1.0, self.publish_diagnostics)
+
+        # model değiştirme: yeni model arka planda yüklenip ısıtılır, hazır olunca tek atamayla devreye girer
+        # görev ortasında node'u yeniden başlatıp saniyelerce kör kalmamak için
+        self.model_loader = None
+        self.load_model_srv = self.create_service(LoadModel, 'vision/load_model', self.load_model_cb)
+
+        # ilk karedeki tembel başlatma gecikmesi uçuşta değil burada ödensin, /vision/ready ondan sonra true
+        self.ready_pub = self.create_publisher(Bool, '/vision/ready', qos_reliable)
+        self.ready_pub.publish(Bool(data=False))
+        self.warmup_backend(self.backend)
+        self.ready_pub.publish(Bool(data=True))
+        self.get_logger().info("[VISION] Ready.")
+
+        self.inference_thread = threading.Thread(target=self.inference_loop, daemon=True)
+        self.inference_thread.start()
+
+
 
     # hedef vurma servisi-------
     def weapons_hot_cb(self, msg):
         self.is_weapons_hot = msg.data
 
 
+    # radar ipucu---------
+    def locked_target_cb(self, msg):
+        target = (msg.position.x, msg.position.y, msg.position.z, time.monotonic())
+        for cam in self.cameras.values():
+            cam.pipeline.locked_target = target
+
+    def own_pos_cb(self, msg):
+        if msg.timestamp > 0:
+            own = (msg.x, msg.y, msg.z, time.monotonic())
+            for cam in self.cameras.values():
+                cam.pipeline.own_pos = own
+
+    def own_att_cb(self, msg):
+        q = (msg.q[0], msg.q[1], msg.q[2], msg.q[3])
+        for cam in self.cameras.values():
+            cam.pipeline.own_q = q
+        self.ego.add_attitude(time.monotonic(), q)
+
+    def own_rate_cb(self, msg):
+        self.ego.add_rates(time.monotonic(), msg.xyz)
+    # radar ipucu---------/
+
+
     #-- 
 
     def call_kill_service(self):
@@ -83,114 +344,361 @@ class VisionTracker(Node):
 
 
 
-    def image_callback(self, msg):
+    # model yükleme / ısınma---------
+    # sıcak yolda görülecek batch ve kare boyları: kamera sayısı kadar tam kare, parçalı (parçalar + tam kare) ve arama penceresi
+    # kare boyu kamera çözünürlüğü, letterbox sonrası model girişi gerçek karedekiyle aynı olsun
+    def warmup_shapes(self):
+        cfg = self.config
+        cameras = len(self.cameras)
+        width, height = self.get_parameter('camera_resolution').value
+        shapes = [([(height, width)] * cameras, None)]
+        if cfg.tiling_mode != 'off':
+            tiles = [(y2 - y1, x2 - x1) for x1, y1, x2, y2 in make_tiles(width, height, cfg.tile_rows, cfg.tile_cols, cfg.tile_overlap)]
+            if cfg.tile_include_full_frame:
+                tiles.append((height, width))
+            shapes.append((tiles * cameras, None))
+        if cfg.roi_enabled:
+            # pencere boyu değişken, en sık görülen en küçük kare pencere
+            shapes.append(([(cfg.roi_min_size, cfg.roi_min_size)] * cameras, cfg.roi_imgsz))
+        return shapes
 
 
-        try:
-            frame = self.bridge.imgmsg_to_cv2(msg, "bgr8")
-            results = self.model(frame, verbose=False)
-            
-            enemy_detected = False
-            best_bbox = None
-            max_conf = 0.0
+    # ısınma camera_resolution ile yapıldı, kamera başka boyda gönderiyorsa ilk karede tembel başlatma ödenir
+    def check_warmup_size(self, frame):
+        width, height = self.get_parameter('camera_resolution').value
+        if frame.shape[:2] != (height, width):
+            self.get_logger().warn(f"[VISION] Frame is {frame.shape[1]}x{frame.shape[0]} but warm-up used {width}x{height}, set camera_resolution")
 
 
+    def warmup_backend(self, backend):
+        iters = self.get_parameter('warmup_iters').value
+        if iters <= 0:
+            return
+        t0 = time.perf_counter()
+        backend.warmup(iters, self.warmup_shapes())
+        self.get_logger().info(f"[VISION] Warm-up done in {time.perf_counter() - t0:.2f}s ({backend.name})")
 
 
-            #birden fazla tespit durumu-------
+    # servis hemen döner, yükleme ayrı thread'de. boş alanlar mevcut ayarı korur
+    def load_model_cb(self, request, response):
+        if self.model_loader is not None and self.model_loader.is_alive():
+            response.success = False
+            response.message = "another model is still loading"
+            return response
 
-            # uçağın heading bilgisini fighter nodundan alırsam kamera pixel konumuna göre değerlendirem yapabilirim ilerde 
-            # şuan en yüksek güven skoruna sahip uçağa kitlen
+        backend = request.backend or self.backend.name
+        precision = request.precision or self.get_parameter('precision').value
+        self.model_loader = threading.Thread(target=self.swap_model, args=(backend, request.model_path, precision), daemon=True)
+        self.model_loader.start()
 
-            for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    conf = float(box.conf[0])
-                    if conf > 0.25 and conf > max_conf: # en az %25 güven skoru gerek
-                        max_conf = conf
-                        x1, y1, x2, y2 = map(int, box.xyxy[0])
-                        best_bbox = (x1, y1, x2, y2)
-                        enemy_detected = True
-            #birden fazla tespit durumu-------/
+        response.success = True
+        response.message = f"loading {backend} {request.model_path or '(default model)'} in background"
+        return response
 
 
+    # yükle, ısıt, sonra değiştir. hata olursa eski model çalışmaya devam eder
+    # inference thread'i her batch başında self.backend'i bir kez okur, yarım yüklenmiş model görmez ve kare düşmez
+    def swap_model(self, backend_name, model_path, precision):
+        try:
+            t0 = time.perf_counter()
+            backend = create_backend(backend_name, model_path, precision, self.get_parameter('device').value, self.get_parameter('imgsz').value)
+            self.warmup_backend(backend)
+        except Exception as e:
+            self.get_logger().error(f"[VISION] Model load failed, keeping {self.backend.model_path}: {e}")
+            return
 
-            pub_data = Float32MultiArray()
-            pub_data.data = [-1.0, -1.0, 0.0, 0.0, 0.0]
+        backend.stats = self.stats
+        self.backend = backend
+        for cam in self.cameras.values():
+            cam.pipeline.backend = backend
+        self.get_logger().info(f"[VISION] Model swapped to {backend.name} ({backend.model_path}) in {time.perf_counter() - t0:.2f}s")
+    # model yükleme / ısınma---------/
 
-            COLOR_GREEN = (0, 255, 0)
-            COLOR_YELLOW = (0, 255, 255)
-            COLOR_RED = (0, 0, 255)
 
 
+    # kamera callback'i: çözme ya da inference yok, sadece son kareyi bırak
+    def image_callback(self, msg, name):
+        received = time.monotonic()
+        if self.decode_pool is not None:
+            self.decode_pool.submit(name, msg, received)
+        else:
+            self.frame_set.put(name, (msg, None, received))
+        recorder = self.cameras[name].recorder
+        if recorder is not None:
+            recorder.submit(msg, self.stamp_seconds(msg.header))
 
-            #Tespit?-------------------------------------------
-            if enemy_detected:
-                x1, y1, x2, y2 = best_bbox
-                width, height = x2 - x1, y2 - y1
-                bbox_center_x, bbox_center_y = x1 + (width // 2), y1 + (height // 2)
 
-                lock_status = 0.0 
-                box_color = COLOR_GREEN
 
+    # inference thread'i, her seferinde tüm kameraların en taze karesini alır eskiler düşer
+    def inference_loop(self):
+        while not self.frame_set.closed:
+            msgs = self.frame_set.get_all(timeout=0.5, gather=self.camera_batch_wait)
+            if msgs:
+                self.process_frames(msgs)
 
 
-                # listener nodundan onay geldi mi--------------
-                if self.is_weapons_hot:
-                    self.lost_frames = 0
-                    self.lock_frames += 1
-                    lock_status = 1.0
-                    box_color = COLOR_RED
 
+    # kameraların kareleri ayrı ayrı hazırlanır, modele giden işler tek batch'te koşar, sonuçlar kamera kamera yayınlanır
+    def process_frames(self, msgs):
+        try:
+            t_start = time.perf_counter()
+            backend = self.backend # model değişse bile bu batch tek modelle işlenir
+            batch = []
+            for name, (msg, frame, received) in msgs.items():
+                cam = self.cameras[name]
+                if frame is None:
+                    with self.stats.measure('decode'):
+                        frame = self.decode_frame(cam, msg)
+                stamp = self.stamp_seconds(msg.header)
+                if not cam.size_checked:
+                    self.check_warmup_size(frame)
+                    cam.size_checked = True
 
-                    
-                    cv2.putText(frame, f"LOCK: {int((self.lock_frames/self.REQUIRED_FRAMES_FOR_KILL)*100)}%", (x1, y2+20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_RED, 2)
+                # duruşlar da kare de alış anıyla (monotonic) tutuluyor, kamera damgası sim saatinde olabilir
+                attitude = self.ego.attitude_at(received)
+                result, job = cam.pipeline.prepare(frame, attitude)
+                batch.append((cam, msg, frame, stamp, received, result, job))
 
-                    if self.lock_frames >= self.REQUIRED_FRAMES_FOR_KILL:
-                        lock_status = 2.0
-                        self.lock_frames = 0
-                        self.call_kill_service()
-                else:
-                    self.lost_frames += 1
-                    if self.lost_frames > self.MAX_TOLERANCE_FRAMES:#timeout kontrolü
-                        self.lock_frames = 0
-                    box_color = COLOR_YELLOW
-                    cv2.putText(frame, "STANDBY", (x1, y2+20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_YELLOW, 2)
+            jobs = [job for *_, job in batch if job is not None]
+            if jobs:
+                run_detect_jobs(backend, jobs, self.config.conf_threshold, self.target_classes)
 
-                # listener nodundan onay geldi mi--------------/
+            for cam, msg, frame, stamp, received, result, job in batch:
+                result = cam.pipeline.finish(result, job, stamp, self.is_weapons_hot)
+                self.publish_result(cam, msg, frame, result, stamp, received)
 
+            self.stats.record('total', time.perf_counter() - t_start)
 
 
 
-                pub_data.data = [float(bbox_center_x), float(bbox_center_y), float(width), float(height), lock_status]
+        except Exception as e:
+            self.get_logger().error(f"[VISION] CV Error: {e}")
 
-                cv2.rectangle(frame, (x1, y1), (x2, y2), box_color, 2) 
-                cv2.circle(frame, (bbox_center_x, bbox_center_y), 5, box_color, -1)#merkez
-                cv2.putText(frame, f"CONF: {max_conf*100:.0f}%", (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, box_color, 2)
 
-            else:
-                self.lost_frames += 1
-                if self.lost_frames > self.MAX_TOLERANCE_FRAMES:
-                    self.lock_frames = 0
 
-            #Tespit?-------------------------------------------
+    def publish_result(self, cam, msg, frame, result, stamp, received):
+        t_publish = time.perf_counter()
+        if result.detections is not None:
+            self.publish_detections(cam, msg.header, *result.detections, result.track_ids)
 
 
 
+        #Tespit?-------------------------------------------
+        with cam.filter_lock:
+            cam.lock_status = result.lock_status
+            if result.bbox is not None:
+                x1, y1, x2, y2 = result.bbox
+                width, height = x2 - x1, y2 - y1
+                cam.kalman.update(stamp, (x1 + width / 2.0, y1 + height / 2.0, width, height))
+                cam.stamp_offset = stamp - received
+            elif cam.kalman.active and cam.kalman.age(stamp) > self.bbox_max_coast:
+                cam.kalman.reset()
+
+        if result.lock_status == LOCK_KILL:
+            self.call_kill_service()
+
+        # kara kutu olayları: vuruş ya da kilidin tolerans dolup kırılması
+        locking = cam.pipeline.lock_timer.lock_start is not None
+        if cam.recorder is not None:
+            if result.lock_status == LOCK_KILL:
+                cam.recorder.trigger('kill', stamp)
+            elif cam.was_locking and not locking:
+                cam.recorder.trigger('lock_lost', stamp)
+        cam.was_locking = locking
+        #Tespit?-------------------------------------------
+
+
+
+        if self.bbox_rate_hz <= 0:
+            self.publish_bbox(cam, stamp)
+        self.stats.record('frame_age', self.get_clock().now().nanoseconds * 1e-9 - stamp)
+        self.stats.record('queue_age', time.monotonic() - received) # alıştan yayına, kendi saatimizle
+
+        # çizim inference yolunda yapılmaz, HUD thread'ine sadece durum bırakılır
+        if self.hud is not None and cam.name == self.hud_camera:
+            self.hud.submit(HudState(
+                frame=frame,
+                header=msg.header,
+                bbox=result.bbox,
+                conf=result.conf,
+                conf_label=("TRK" if result.tracked else "CONF") + (f" #{result.track_id}" if result.track_id >= 0 else ""),
+                lock_status=result.lock_status,
+                lock_pct=int(result.lock_progress*100),
+                roi=result.roi,
+                weapons_hot=self.is_weapons_hot,
+            ))
+
+        self.stats.record('publish', time.perf_counter() - t_publish)
+
+
+
+    # Kalman tahmini t anına taşınır (kamera damgası saati), son tespit çok eskiyse hedef yok
+    # t None: şimdiki an, alış zamanı üzerinden damga saatine çevrilir
+    def publish_bbox(self, cam, t=None):
+        with cam.filter_lock:
+            if t is None and cam.stamp_offset is not None:
+                t = time.monotonic() + cam.stamp_offset
+            estimate = cam.kalman.predict(t)
+            age = cam.kalman.age(t)
+            lock_status = cam.lock_status
+            # kill tek seferlik olay, sabit hızlı yayında her tikte tekrar gitmesin
+            if lock_status == LOCK_KILL:
+                cam.lock_status = LOCK_NONE
+
+        pub_data = cam.bbox_msg.data
+        if estimate is None or age > self.bbox_max_coast:
+            for i, v in enumerate(NO_TARGET):
+                pub_data[i] = v
+        else:
+            (cx, cy, w, h), std = estimate
+            pub_data[0], pub_data[1], pub_data[2], pub_data[3] = cx, cy, w, h
+            pub_data[4], pub_data[5], pub_data[6], pub_data[7] = lock_status, std[0], std[1], age
+        cam.bbox_pub.publish(cam.bbox_msg)
+
+
+    def publish_bbox_predictions(self):
+        for cam in self.cameras.values():
+            self.publish_bbox(cam)
+
+
+
+    # kare zaman damgası saniye, damga boşsa (bazı sim yayıncıları) node saati
+    def stamp_seconds(self, header):
+        if header.stamp.sec == 0 and header.stamp.nanosec == 0:
+            return self.get_clock().now().nanoseconds * 1e-9
+        return header.stamp.sec + header.stamp.nanosec * 1e-9
+
+
+
+    # kara kutu encoder thread'i için, kendi bufferı var (inference halkasıyla çakışmasın)
+    def decode_blackbox(self, name, msg):
+        if isinstance(msg, CompressedImage):
+            return decode_compressed(msg)
+        out = self.buffers.get(('blackbox', name), (msg.height, msg.width, 3)) if msg.encoding == 'rgb8' else None
+        frame = image_to_bgr(msg, out)
+        if frame is None:
+            frame = CvBridge().imgmsg_to_cv2(msg, "bgr8")
+        return frame
+
+
+    # bgr8/rgb8 için kopyasız yol, diğer encodinglerde CvBridge
+    def decode_frame(self, cam, msg):
+        cam.frame_index += 1
+        out = self.buffers.get(('bgr', cam.name, cam.frame_index % 3), (msg.height, msg.width, 3)) if msg.encoding == 'rgb8' else None
+        frame = image_to_bgr(msg, out)
+        if frame is None:
+            frame = self.bridge.imgmsg_to_cv2(msg, "bgr8")
+        return frame
+
+
+
+    # eşiği geçen tüm tespitleri yayınla, guidance tarafı birden fazla hedefi görebilsin
+    # iz ID'si Detection2D.id'de, izsiz tespitte boş
+    def publish_detections(self, cam, header, boxes, confs, clss, track_ids=None):
+        out = Detection2DArray()
+        out.header = header
+        ids = track_ids.tolist() if track_ids is not None else [-1] * len(confs)
+
+        for (x1, y1, x2, y2), conf, cls, track_id in zip(boxes.tolist(), confs.tolist(), clss.tolist(), ids):
+            det = Detection2D()
+            det.header = header
+            if track_id >= 0:
+                det.id = str(track_id)
+            det.bbox.center.position.x = (x1 + x2) / 2.0
+            det.bbox.center.position.y = (y1 + y2) / 2.0
+            det.bbox.size_x = x2 - x1
+            det.bbox.size_y = y2 - y1
+
+            hyp = ObjectHypothesisWithPose()
+            hyp.hypothesis.class_id = str(cls)
+            hyp.hypothesis.score = conf
+            det.results.append(hyp)
+            out.detections.append(det)
+
+        cam.detections_pub.publish(out)
+
+
+
+    # HUD ---------
+    # HUD thread'i çizimi bitirince çağırır
+    def on_hud_frame(self, frame, state):
+        if self.hud_publish:
+            ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.hud_jpeg_quality])
+            if ok:
+                out = CompressedImage()
+                out.header = state.header
+                out.format = 'jpeg'
+                out.data = jpeg.tobytes()
+                self.hud_pub.publish(out)
+
+        if not self.headless:
+            with self.hud_lock:
+                self.hud_frame = frame
+
+
+    def display_callback(self):
+        with self.hud_lock:
+            frame = self.hud_frame
+            self.hud_frame = None
+        if frame is not None:
+            cv2.imshow("HUD", frame)
+        cv2.waitKey(1)
+    # HUD ---------/
 
 
-            wso_text = "WSO: HOT" if self.is_weapons_hot else "WSO: STANDBY"
-            wso_color = COLOR_RED if self.is_weapons_hot else COLOR_YELLOW
-            cv2.putText(frame, wso_text, (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, wso_color, 2)
 
-            self.bbox_pub.publish(pub_data)
-            cv2.imshow("HUD", frame)
-            cv2.waitKey(1)
+    def log_frame_stats(self):
+        for name in self.cameras:
+            received, processed, dropped = self.frame_set.stats(name)
+            self.get_logger().info(f"[VISION] Frames{' ' + name if name else ''} rx: {received} processed: {processed} dropped: {dropped}")
 
 
+    # gecikme yüzdelikleri ve kare sayaçları, termal yavaşlama da burada görünür
+    def publish_diagnostics(self):
+        received, processed, dropped = self.frame_set.stats()
 
-        except Exception as e:
-            self.get_logger().error(f"[VISION] CV Error: {e}")
+        status = DiagnosticStatus()
+        status.level = DiagnosticStatus.OK
+        status.name = 'vision_tracker: pipeline latency'
+        status.hardware_id = self.backend.name
+        status.message = f"{processed}/{received} frames processed"
+        status.values = [
+            KeyValue(key='frames_received', value=str(received)),
+            KeyValue(key='frames_processed', value=str(processed)),
+            KeyValue(key='frames_dropped', value=str(dropped)),
+        ]
+        if self.decode_pool is not None:
+            status.values.append(KeyValue(key='decode_dropped', value=str(self.decode_pool.dropped)))
+            status.values.append(KeyValue(key='decode_failed', value=str(self.decode_pool.failed)))
+        if len(self.cameras) > 1:
+            for name in self.cameras:
+                cam_received, cam_processed, cam_dropped = self.frame_set.stats(name)
+                status.values.append(KeyValue(key=f"{name}.frames_received", value=str(cam_received)))
+                status.values.append(KeyValue(key=f"{name}.frames_processed", value=str(cam_processed)))
+                status.values.append(KeyValue(key=f"{name}.frames_dropped", value=str(cam_dropped)))
+        for stage, (p50, p95, p99, _) in self.stats.summary().items():
+            status.values.append(KeyValue(key=f"{stage}.p50_ms", value=f"{p50:.2f}"))
+            status.values.append(KeyValue(key=f"{stage}.p95_ms", value=f"{p95:.2f}"))
+            status.values.append(KeyValue(key=f"{stage}.p99_ms", value=f"{p99:.2f}"))
+
+        out = DiagnosticArray()
+        out.header.stamp = self.get_clock().now().to_msg()
+        out.status = [status]
+        self.diag_pub.publish(out)
+
+
+    def stop_inference(self):
+        self.frame_set.close()
+        if self.decode_pool is not None:
+            self.decode_pool.shutdown()
+        self.inference_thread.join(timeout=2.0)
+        if self.hud is not None:
+            self.hud.stop()
+        for cam in self.cameras.values():
+            if cam.recorder is not None:
+                cam.recorder.stop()
+        self.log_frame_stats()
+        self.get_logger().info("[VISION] Stage latency (ms):\n" + self.stats.format())
 
 
 
@@ -207,8 +715,10 @@ def main(args=None):
     except KeyboardInterrupt:
         pass
     finally:
+        visionT.stop_inference()
         visionT.destroy_node()
-        cv2.destroyAllWindows()
+        if not visionT.headless:
+            cv2.destroyAllWindows()
         rclpy.shutdown()
 
 if __name__ == '__main__':
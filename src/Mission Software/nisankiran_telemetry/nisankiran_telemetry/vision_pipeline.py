@@ -0,0 +1,448 @@
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .detection import make_tiles, tile_crops, merge_tiles, best_index
+from .bbox_tracker import FlowTracker
+from .multi_tracker import MultiTracker
+from .image_io import BufferPool
+from .lock_timer import LockTimer, LOCK_NONE
+from .ego_motion import camera_rotation, bbox_shift
+from .search_window import focal_from_hfov, project_ned_to_image, window_from_bbox, window_from_projection
+
+
+# VisionTracker'ın tespit, hedef seçimi ve kilit mantığı. rclpy'ye bağlı değil
+# node ve offline replay (vision_replay) aynı sınıfı kullanır
+
+
+# ayarların hepsi node'da aynı isimle ROS parametresi olur
+@dataclass
+class PipelineConfig:
+    conf_threshold: float = 0.25 # en az %25 güven skoru gerek
+    target_classes: List[int] = field(default_factory=lambda: [-1]) # hangi sınıflar düşman sayılsın, [-1] = tüm sınıflar
+
+    # kilit süresi kare sayısıyla değil kare zaman damgasıyla ölçülür
+    lock_seconds: float = 4.0 # yarışma için kilitlenme süresini 5sn yapıcaz şuan 4
+    lock_tolerance_seconds: float = 1.0 # yaklaşık 1 saniye kayıp payı biraz düşebilir
+
+    # çoklu hedef: tespitlere kalıcı iz ID'si, kilit tek ID'yi takip eder (kapalıysa her karede en güvenilir kutu)
+    mot_enabled: bool = True
+    mot_high_conf: float = 0.5  # altındaki tespitler izlerle ikinci turda eşleşir
+    mot_match_iou: float = 0.3
+    mot_max_misses: int = 15    # tespit adımı
+    mot_min_hits: int = 1       # kilitlenmek için izin en az eşleşme sayısı
+
+    # parçalı (tiled) inference. off: kapalı, on: her karede, auto: N kare hedef görülmezse devreye girer
+    tiling_mode: str = 'off'
+    tile_rows: int = 2
+    tile_cols: int = 3
+    tile_overlap: float = 0.2
+    tile_auto_after_frames: int = 15
+    tile_include_full_frame: bool = True
+    tile_small_target_px: int = 32 # bundan küçük hedef parçalarla bulunduysa parçalıda kal
+    nms_iou: float = 0.45
+
+    # tespit et sonra takip et. YOLO her N karede bir koşar, aradaki karelerde kutuyu optik akış taşır
+    tracking_enabled: bool = False
+    detect_interval_min: int = 2
+    detect_interval_max: int = 15
+    track_min_confidence: float = 0.5
+    track_max_scale_change: float = 1.5 # son tespite göre boyut bu oranı aşarsa kaymış say
+
+    # arama penceresi (ROI). son kutunun etrafı ya da radar hedefinin kameradaki izdüşümü
+    roi_enabled: bool = False
+    roi_imgsz: int = 320        # pencere için model giriş boyu
+    roi_bbox_scale: float = 3.0 # pencere = kutu boyu x bu oran
+    roi_min_size: int = 160
+    roi_radar_timeout: float = 1.0 # bu kadar saniyeden eski radar verisi kullanılmaz
+    camera_hfov_deg: float = 120.0
+    camera_pitch_deg: float = 0.0
+    target_span_m: float = 2.0  # düşman kanat açıklığı, beklenen piksel boyu için
+
+    # ego hareket: kareler arası kamera dönüşü kadar son kutu, takipçi ve izler aramadan önce kaydırılır
+    ego_motion_enabled: bool = True
+
+
+
+# bir karenin sonucu
+@dataclass
+class FrameResult:
+    bbox: Optional[Tuple[int, int, int, int]] = None
+    conf: float = 0.0
+    tracked: bool = False
+    tiled: bool = False
+    lock_status: float = LOCK_NONE
+    lock_progress: float = 0.0
+    roi: Optional[Tuple[int, int, int, int]] = None
+    detections: Optional[tuple] = None # (boxes, confs, clss), sadece model koştuysa
+    track_ids: Optional[np.ndarray] = None # detections ile aynı sırada iz ID'leri, -1 izsiz
+    track_id: int = -1 # kilitlenilen iz
+
+
+
+# bir karenin modele gidecek kırpıntıları (tam kare, parçalar ya da arama penceresi)
+# tespit işi ayrı nesne ki birden fazla kameranın işleri tek batch'te toplanabilsin
+@dataclass
+class DetectJob:
+    crops: list
+    offsets: list                # her kırpıntının tam karedeki (x, y) ofseti
+    imgsz: Optional[int] = None  # None: arka ucun varsayılan giriş boyu
+    merge: bool = False          # parçalı: kutular global NMS ile birleşir
+    outputs: Optional[list] = None
+
+
+# işlerin kırpıntıları giriş boyuna göre gruplanır, her grup tek backend.detect çağrısı
+# kameralar tek model örneğini paylaşır, kamera başına ayrı node/model yerine tek batch
+def run_detect_jobs(backend, jobs, conf_threshold, classes=None):
+    groups = {}
+    for job in jobs:
+        groups.setdefault(job.imgsz, []).append(job)
+
+    for imgsz, group in groups.items():
+        outputs = backend.detect([crop for job in group for crop in job.crops], conf_threshold, classes, imgsz)
+        i = 0
+        for job in group:
+            job.outputs = outputs[i:i + len(job.crops)]
+            i += len(job.crops)
+
+
+
+class VisionPipeline:
+    def __init__(self, backend, config=None, stats=None):
+        self.backend = backend
+        self.config = config or PipelineConfig()
+        self.stats = stats
+
+        cfg = self.config
+        self.target_classes = [c for c in cfg.target_classes if c >= 0] or None
+        self.lock_timer = LockTimer(cfg.lock_seconds, cfg.lock_tolerance_seconds)
+
+        # çoklu hedef izleri, kilitlenilen iz
+        self.mot = MultiTracker(cfg.mot_high_conf, cfg.mot_match_iou, cfg.mot_max_misses, cfg.mot_min_hits)
+        self.target_id = -1
+
+        # parçalı inference durumu
+        self.frames_since_seen = 0
+        self.last_hit_was_tiled = False
+        self.last_hit_size = 0
+        self.tiles = None
+        self.tiles_shape = None
+
+        # takip durumu
+        self.tracker = FlowTracker()
+        self.detect_interval = cfg.detect_interval_min
+        self.frames_since_detect = 0
+        self.last_detect_size = None
+
+        # arama penceresi durumu
+        self.last_bbox = None
+        self.bbox_velocity = (0.0, 0.0) # piksel / kare
+        self.force_full_frame = False
+
+        # radar ipucu, node callback'leri doldurur
+        self.locked_target = None # (x, y, z, alış zamanı)
+        self.own_pos = None
+        self.own_q = None
+
+        self.prev_attitude = None # bir önceki karedeki duruş (w, x, y, z)
+
+        # gri kare için 2'li buffer, takipçi bir önceki griyi tutuyor
+        self.buffers = BufferPool()
+        self.frame_index = 0
+        self.gray = None
+
+
+    def record(self, stage, seconds):
+        if self.stats is not None:
+            self.stats.record(stage, seconds)
+
+
+    # tek kare: takip ya da tespit, hedef seçimi, kilit sayacı
+    def process(self, frame, stamp, weapons_hot):
+        result, job = self.prepare(frame)
+        if job is not None:
+            run_detect_jobs(self.backend, [job], self.config.conf_threshold, self.target_classes)
+        return self.finish(result, job, stamp, weapons_hot)
+
+
+    # 1. aşama: takip, takip yetmezse modele gidecek işi hazırla. job None ise model çağrılmaz
+    # attitude: kare anındaki kendi duruşumuz (PX4 q), verilirse ego hareket telafisi yapılır
+    def prepare(self, frame, attitude=None):
+        cfg = self.config
+        result = FrameResult()
+        self.frame_index += 1
+        self.gray = None
+        tracker_shift = self.ego_compensate(frame.shape, attitude)
+
+        # aradaki karelerde kutuyu takipçi taşısın
+        if cfg.tracking_enabled:
+            t0 = time.perf_counter()
+            gray_buf = self.buffers.get(('gray', self.frame_index % 2), frame.shape[:2])
+            self.gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray_buf)
+            result.bbox, result.conf = self.track_target(self.gray, frame.shape, tracker_shift)
+            result.tracked = result.bbox is not None
+            if result.tracked:
+                result.track_id = self.target_id
+                # kilitli iz de takip kutusuyla ilerlesin, yoksa detect_interval kare eski kutuyla eşleşemez ve yeni ID açılır
+                if cfg.mot_enabled and self.target_id >= 0:
+                    self.mot.observe(self.target_id, result.bbox)
+            self.record('track', time.perf_counter() - t0)
+
+        job = None if result.tracked else self.plan_detection(frame, result)
+        return result, job
+
+
+    # 2. aşama: model çıktısından hedef seçimi, takipçiyi yeniden başlat, kilit sayacı
+    def finish(self, result, job, stamp, weapons_hot):
+        if job is not None:
+            self.apply_detection(result, job)
+            if self.config.tracking_enabled:
+                self.restart_tracker(self.gray, result.bbox)
+
+        t_select = time.perf_counter()
+        self.remember_bbox(result.bbox)
+
+        # listener nodundan onay geldi mi--------------
+        result.lock_status = self.lock_timer.update(stamp, result.bbox is not None and weapons_hot)
+        result.lock_progress = self.lock_timer.progress()
+        # listener nodundan onay geldi mi--------------/
+
+        self.record('select', time.perf_counter() - t_select)
+        return result
+
+
+
+    # arama penceresi, parçalı ya da tam kare
+    def plan_detection(self, frame, result):
+        cfg = self.config
+
+        result.roi = self.search_window(frame.shape) if cfg.roi_enabled else None
+        if result.roi is not None:
+            # pencereyi kırp, küçük girişle modele ver
+            x1, y1, x2, y2 = result.roi
+            return DetectJob([frame[y1:y2, x1:x2]], [(x1, y1)], cfg.roi_imgsz)
+
+        if self.use_tiling():
+            result.tiled = True
+            crops, offsets = tile_crops(frame, self.get_tiles(frame), cfg.tile_include_full_frame)
+            return DetectJob(crops, offsets, merge=True)
+
+        return DetectJob([frame], [(0, 0)])
+
+
+    # en güvenilir kutuyu sonuca yaz
+    def apply_detection(self, result, job):
+        #birden fazla tespit durumu-------
+
+        # uçağın heading bilgisini fighter nodundan alırsam kamera pixel konumuna göre değerlendirem yapabilirim ilerde
+        # şuan en yüksek güven skoruna sahip uçağa kitlen, iz açıkken o uçak kaybolana kadar aynı ize
+
+        # kutu kutu tensor->python dönüşümü yerine tüm tespitler tek numpy dizisinde
+        if job.merge:
+            boxes, confs, clss = merge_tiles(job.outputs, job.offsets, self.config.nms_iou)
+        else:
+            boxes, confs, clss = job.outputs[0]
+            ox, oy = job.offsets[0]
+            if len(confs) and (ox or oy):
+                boxes = boxes + np.array([ox, oy, ox, oy], dtype=boxes.dtype)
+
+        if result.roi is not None and len(confs) == 0:
+            self.force_full_frame = True # pencerede yok, bir sonraki kare tam kare
+
+        result.detections = (boxes, confs, clss)
+
+        if self.config.mot_enabled:
+            t0 = time.perf_counter()
+            result.track_ids = self.mot.update(boxes, confs, clss)
+            best = self.select_track(result.track_ids, confs)
+            result.track_id = self.target_id if best >= 0 else -1
+            self.record('mot', time.perf_counter() - t0)
+        else:
+            best = best_index(confs)
+        if best < 0:
+            self.frames_since_seen += 1
+            return
+
+        result.bbox = tuple(boxes[best].astype(int).tolist())
+        result.conf = float(confs[best])
+        self.frames_since_seen = 0
+        self.last_hit_was_tiled = result.tiled
+        self.last_hit_size = max(result.bbox[2] - result.bbox[0], result.bbox[3] - result.bbox[1])
+        #birden fazla tespit durumu-------/
+
+
+
+    # ego hareket---------
+    # önceki kareden bu kareye kamera dönüşü: son kutu (arama penceresi) ve izler kayar
+    # dönen: takipçi kutusunun beklenen kayması, LK aramaya oradan başlar
+    def ego_compensate(self, shape, attitude):
+        prev, self.prev_attitude = self.prev_attitude, attitude
+        if not self.config.ego_motion_enabled or attitude is None or prev is None:
+            return None
+
+        t0 = time.perf_counter()
+        h, w = shape[:2]
+        fx = focal_from_hfov(w, self.config.camera_hfov_deg)
+        rot = camera_rotation(prev, attitude, self.config.camera_pitch_deg)
+
+        def shift_of(bbox):
+            return bbox_shift(bbox, rot, fx, fx, w / 2.0, h / 2.0)
+
+        if self.last_bbox is not None:
+            shift = shift_of(self.last_bbox)
+            if shift is not None:
+                x1, y1, x2, y2 = self.last_bbox
+                self.last_bbox = (x1 + shift[0], y1 + shift[1], x2 + shift[0], y2 + shift[1])
+
+        self.mot.compensate(shift_of)
+        tracker_shift = shift_of(self.tracker.bbox) if self.tracker.active else None
+        self.record('ego', time.perf_counter() - t0)
+        return tracker_shift
+    # ego hareket---------/
+
+
+
+    # kilit tek iz ID'sini takip eder, hedef izi silinmedikçe daha güvenilir başka uçağa atlamaz
+    # hedef değişirse kilit sayacı sıfırdan başlar, yanlış uçak üstüne süre birikmesin
+    def select_track(self, track_ids, confs):
+        if self.target_id >= 0 and self.mot.get(self.target_id) is not None:
+            hits = np.flatnonzero(track_ids == self.target_id)
+            return int(hits[0]) if len(hits) else -1
+
+        best = -1
+        for i, track_id in enumerate(track_ids):
+            if track_id >= 0 and self.mot.confirmed(self.mot.get(track_id)) and (best < 0 or confs[i] > confs[best]):
+                best = i
+
+        new_target = int(track_ids[best]) if best >= 0 else -1
+        if new_target >= 0 and new_target != self.target_id:
+            self.lock_timer.reset()
+        self.target_id = new_target
+        return best
+
+
+
+    # arama penceresi---------
+    # öncelik: son kutu, sonra radar izdüşümü. ıskadan sonraki kare tam kare
+    def search_window(self, shape):
+        if self.force_full_frame:
+            self.force_full_frame = False
+            return None
+
+        h, w = shape[:2]
+        if self.last_bbox is not None:
+            return window_from_bbox(self.last_bbox, self.bbox_velocity, w, h, self.config.roi_bbox_scale, self.config.roi_min_size)
+        return self.radar_window(w, h)
+
+
+    # radarın kilitli hedefini kameraya izdüşür
+    def radar_window(self, w, h):
+        cfg = self.config
+        target, own, q = self.locked_target, self.own_pos, self.own_q
+        if target is None or own is None or q is None:
+            return None
+
+        now = time.monotonic()
+        if now - target[3] > cfg.roi_radar_timeout or now - own[3] > cfg.roi_radar_timeout:
+            return None
+
+        fx = focal_from_hfov(w, cfg.camera_hfov_deg)
+        rel = (target[0] - own[0], target[1] - own[1], target[2] - own[2])
+        projected = project_ned_to_image(rel, q, fx, fx, w / 2.0, h / 2.0, cfg.camera_pitch_deg)
+        if projected is None:
+            return None
+
+        u, v, depth = projected
+        return window_from_projection(u, v, depth, fx, w, h, cfg.target_span_m, min_size=cfg.roi_min_size)
+
+
+    # pencerenin bir sonraki karede nereye kayacağı için kutu hızını tut
+    def remember_bbox(self, bbox):
+        if bbox is None:
+            self.last_bbox = None
+            self.bbox_velocity = (0.0, 0.0)
+            return
+
+        if self.last_bbox is not None:
+            px1, py1, px2, py2 = self.last_bbox
+            x1, y1, x2, y2 = bbox
+            self.bbox_velocity = ((x1 + x2 - px1 - px2) / 2.0, (y1 + y2 - py1 - py2) / 2.0)
+        self.last_bbox = bbox
+    # arama penceresi---------/
+
+
+
+    # tespit et sonra takip et---------
+    # takip edilebiliyorsa kutuyu döndür, yeniden tespit gerekiyorsa None
+    def track_target(self, gray, shape, shift=None):
+        cfg = self.config
+        if not self.tracker.active or self.frames_since_detect >= self.detect_interval:
+            return None, 0.0
+
+        bbox, confidence = self.tracker.update(gray, shift)
+        if bbox is None or confidence < cfg.track_min_confidence or self.track_drifted(bbox, shape):
+            # güven düştü, aralığı daralt ve bu karede hemen tespit et
+            self.detect_interval = max(cfg.detect_interval_min, self.detect_interval // 2)
+            self.tracker.reset()
+            return None, 0.0
+
+        # takip sağlam gidiyor, modeli daha seyrek çağır
+        if confidence > 0.8:
+            self.detect_interval = min(cfg.detect_interval_max, self.detect_interval + 1)
+
+        self.frames_since_detect += 1
+        self.frames_since_seen = 0
+        return tuple(int(round(v)) for v in bbox), confidence
+
+
+    # kutu kadrajdan çıktıysa ya da boyutu son tespite göre çok değiştiyse kaymış say
+    def track_drifted(self, bbox, shape):
+        h, w = shape[:2]
+        x1, y1, x2, y2 = bbox
+        if x1 < 0 or y1 < 0 or x2 > w or y2 > h:
+            return True
+
+        size = max(x2 - x1, y2 - y1)
+        ratio = size / max(self.last_detect_size, 1.0)
+        return ratio > self.config.track_max_scale_change or ratio < 1.0 / self.config.track_max_scale_change
+
+
+    def restart_tracker(self, gray, bbox):
+        self.frames_since_detect = 0
+        if bbox is None:
+            self.tracker.reset()
+            return
+        self.last_detect_size = float(max(bbox[2] - bbox[0], bbox[3] - bbox[1]))
+        self.tracker.init(gray, bbox)
+    # tespit et sonra takip et---------/
+
+
+
+    # parçalı inference---------
+    def use_tiling(self):
+        cfg = self.config
+        if cfg.tiling_mode == 'on':
+            return True
+        if cfg.tiling_mode != 'auto':
+            return False
+
+        # hedef uzun süredir yok, uzak ve küçük olabilir
+        if self.frames_since_seen >= cfg.tile_auto_after_frames:
+            return True
+
+        # küçük hedefi parçalarla yakaladıysak tam kareye dönünce tekrar kaybederiz
+        return self.last_hit_was_tiled and self.last_hit_size < cfg.tile_small_target_px
+
+
+    # kamera çözünürlüğü değişmedikçe parçaları tekrar hesaplama
+    def get_tiles(self, frame):
+        if self.tiles_shape != frame.shape[:2]:
+            h, w = frame.shape[:2]
+            cfg = self.config
+            self.tiles = make_tiles(w, h, cfg.tile_rows, cfg.tile_cols, cfg.tile_overlap)
+            self.tiles_shape = frame.shape[:2]
+        return self.tiles
+    # parçalı inference---------/
@@ -0,0 +1,170 @@
+import argparse
+import glob
+import os
+import time
+from dataclasses import replace
+
+import cv2
+
+from .backends import BACKENDS, create_backend
+from .lock_timer import LOCK_KILL
+from .stage_stats import StageStats
+from .vision_pipeline import PipelineConfig, VisionPipeline
+
+
+# video dosyasını ya da resim klasörünü VisionTracker'ın tespit/seçim/kilit hattından geçirir, ros gerekmez
+# uçuş testinden önce CPU'lu laptopta performans gerilemesi yakalamak için
+#   ros2 run nisankiran_telemetry vision_replay kayit.mp4 --backends ultralytics,onnxruntime --modes full,track,tiled+track
+#   ros2 run nisankiran_telemetry vision_replay kareler/ --fps 30 --realtime --timeline
+
+
+# mod adı -> PipelineConfig değişiklikleri, '+' ile birleştirilebilir (track+roi)
+MODES = {
+    'full': {},
+    'tiled': {'tiling_mode': 'on'},
+    'autotile': {'tiling_mode': 'auto'},
+    'track': {'tracking_enabled': True},
+    'roi': {'roi_enabled': True},
+}
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def mode_config(mode, base):
+    overrides = {}
+    for part in mode.split('+'):
+        if part not in MODES:
+            raise ValueError(f"Unknown mode '{part}', choose from {list(MODES)}")
+        overrides.update(MODES[part])
+    return replace(base, **overrides)
+
+
+# (zaman damgası, kare) üretici, resim klasöründe damga = sıra / fps
+def read_frames(source, fps, max_frames):
+    if os.path.isdir(source):
+        paths = sorted(p for p in glob.glob(os.path.join(source, '*')) if p.lower().endswith(IMAGE_EXTS))
+        for i, path in enumerate(paths[:max_frames or None]):
+            frame = cv2.imread(path)
+            if frame is not None:
+                yield i / fps, frame
+        return
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Video could not be opened: {source}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or fps
+    i = 0
+    try:
+        while not max_frames or i < max_frames:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            yield i / fps, frame
+            i += 1
+    finally:
+        cap.release()
+
+
+# realtime: kamera beklemez, işlem sürerken geçen kareler düşer (node'daki son kare kutusu gibi)
+def run(pipeline, frames, weapons_hot, realtime):
+    stats = pipeline.stats
+    timeline = []
+    processed = dropped = detected_frames = boxes = kills = 0
+    busy_until = 0.0
+    was_locking = False
+
+    wall_start = time.perf_counter()
+    for stamp, frame in frames:
+        if realtime and stamp < busy_until:
+            dropped += 1
+            continue
+
+        t0 = time.perf_counter()
+        result = pipeline.process(frame, stamp, weapons_hot)
+        elapsed = time.perf_counter() - t0
+        stats.record('total', elapsed)
+        busy_until = stamp + elapsed
+        processed += 1
+
+        if result.bbox is not None:
+            detected_frames += 1
+        if result.detections is not None:
+            boxes += len(result.detections[1])
+
+        # kilit zaman çizelgesi, tolerans içindeki kısa kayıplar kilidi bozmaz, sayaç sıfırlanınca "lost"
+        locking = pipeline.lock_timer.lock_start is not None
+        if result.lock_status == LOCK_KILL:
+            kills += 1
+            timeline.append((stamp, 'KILL'))
+        elif locking and not was_locking:
+            timeline.append((stamp, 'lock start'))
+        elif was_locking and not locking:
+            timeline.append((stamp, 'lock lost'))
+        was_locking = locking
+
+    wall = time.perf_counter() - wall_start
+    return {
+        'fps': processed / wall if wall > 0 else 0.0,
+        'processed': processed,
+        'dropped': dropped,
+        'detected_frames': detected_frames,
+        'boxes': boxes,
+        'kills': kills,
+        'timeline': timeline,
+    }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Replay a video / image directory through the vision pipeline without ROS')
+    parser.add_argument('source', help='video dosyası ya da resim klasörü')
+    parser.add_argument('--backends', default='ultralytics')
+    parser.add_argument('--modes', default='full', help=f"virgülle ayrılmış, '+' ile birleşik: {','.join(MODES)}")
+    parser.add_argument('--model-path', default='', help='boşsa arka ucun varsayılan modeli')
+    parser.add_argument('--precision', default='fp32')
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--fps', type=float, default=30.0, help='resim klasörü için kare hızı')
+    parser.add_argument('--max-frames', type=int, default=0)
+    parser.add_argument('--no-weapons-hot', action='store_true', help='kilit sayacını çalıştırma')
+    parser.add_argument('--realtime', action='store_true', help='kameraya yetişemeyen kareleri düşür')
+    parser.add_argument('--timeline', action='store_true', help='kilit olaylarını yazdır')
+    parser.add_argument('--stages', action='store_true', help='aşama gecikmelerini yazdır')
+    opts = parser.parse_args(args)
+
+    base = PipelineConfig()
+    rows = []
+    for backend_name in opts.backends.split(','):
+        backend_name = backend_name.strip()
+        if backend_name not in BACKENDS:
+            parser.error(f"unknown backend {backend_name}")
+        try:
+            backend = create_backend(backend_name, opts.model_path, opts.precision, opts.device, opts.imgsz)
+        except Exception as e:
+            print(f"{backend_name}: skipped ({e})")
+            continue
+
+        for mode in opts.modes.split(','):
+            stats = StageStats(window=100000)
+            backend.stats = stats
+            pipeline = VisionPipeline(backend, mode_config(mode.strip(), base), stats)
+
+            frames = read_frames(opts.source, opts.fps, opts.max_frames)
+            r = run(pipeline, frames, not opts.no_weapons_hot, opts.realtime)
+            p50, p95, p99, _ = stats.summary().get('total', (0.0, 0.0, 0.0, 0))
+            rows.append((backend_name, mode, r, p50, p95, p99))
+
+            if opts.stages:
+                print(f"\n[{backend_name} / {mode}] stage latency (ms)\n{stats.format()}")
+            if opts.timeline:
+                print(f"\n[{backend_name} / {mode}] lock timeline")
+                for stamp, event in r['timeline']:
+                    print(f"  {stamp:8.2f}s  {event}")
+
+    print(f"\n{'backend':<13}{'mode':<14}{'fps':>7}{'p50':>8}{'p95':>8}{'p99':>8}{'frames':>8}{'drop':>6}{'det%':>7}{'boxes':>7}{'kills':>6}")
+    for backend_name, mode, r, p50, p95, p99 in rows:
+        det_pct = 100.0 * r['detected_frames'] / r['processed'] if r['processed'] else 0.0
+        print(f"{backend_name:<13}{mode:<14}{r['fps']:>7.1f}{p50:>8.1f}{p95:>8.1f}{p99:>8.1f}{r['processed']:>8}{r['dropped']:>6}{det_pct:>7.1f}{r['boxes']:>7}{r['kills']:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -30,6 +30,11 @@ setup(
             'radar = nisankiran_telemetry.server_listener:main',
             'fake_server = nisankiran_telemetry.fake_server:main',
             'vision = nisankiran_telemetry.vision:main', 
+            'backend_bench = nisankiran_telemetry.backend_bench:main',
+            'frame_bench = nisankiran_telemetry.frame_bench:main',
+            'vision_replay = nisankiran_telemetry.vision_replay:main',
+            'radar_bench = nisankiran_telemetry.radar_bench:main',
+            'radar_stress = nisankiran_telemetry.radar_stress:main',
         ],
     },
 
@@ -0,0 +1,33 @@
+import numpy as np
+
+from nisankiran_telemetry.multi_tracker import MultiTracker
+
+
+def detections(*boxes, conf=0.9):
+    return (np.array(boxes, dtype=float).reshape(-1, 4),
+            np.full(len(boxes), conf),
+            np.zeros(len(boxes), dtype=np.int64))
+
+
+def test_low_confidence_detection_starts_confirmed_track():
+    mot = MultiTracker(high_conf=0.5)
+    track_ids = mot.update(*detections((100, 100, 140, 140), conf=0.3))
+    assert track_ids[0] == 1
+    assert mot.confirmed(mot.get(1))
+
+
+# tek karelik iz ilk ıskada gider, en az iki kez görülen iz max_misses boyunca kalır
+def test_one_hit_track_pruned_on_first_miss():
+    mot = MultiTracker(max_misses=3)
+    target, clutter = (100, 100, 140, 140), (600, 300, 620, 320)
+    mot.update(*detections(target))
+    mot.update(*detections(target, clutter))
+    assert [t.track_id for t in mot.tracks] == [1, 2]
+
+    mot.update(*detections())
+    assert [t.track_id for t in mot.tracks] == [1]
+    for _ in range(2):
+        mot.update(*detections())
+    assert mot.get(1) is not None
+    mot.update(*detections())
+    assert mot.tracks == []
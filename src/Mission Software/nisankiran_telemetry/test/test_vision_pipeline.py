@@ -0,0 +1,74 @@
+import numpy as np
+
+from nisankiran_telemetry.lock_timer import LOCK_KILL
+from nisankiran_telemetry.vision_pipeline import PipelineConfig, VisionPipeline
+
+
+# kutuyu her karede gerçek yerinde bulan sahte model, pipeline kırpıntı ofsetini kendisi ekler
+class FakeBackend:
+    def __init__(self, conf=0.9):
+        self.box = None
+        self.conf = conf
+        self.calls = 0
+
+    def detect(self, images, conf_threshold, classes=None, imgsz=None):
+        self.calls += 1
+        boxes = np.array([self.box], dtype=np.float32)
+        return [(boxes, np.array([self.conf], dtype=np.float32), np.zeros(1, dtype=np.int64)) for _ in images]
+
+
+def render(background, x, y, size, pattern):
+    frame = background.copy()
+    frame[y:y + size, x:x + size] = pattern
+    return frame
+
+
+def count_kills(config, seconds=10.0, fps=30.0, speed=3, size=40, conf=0.9):
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 60, (720, 1280, 3), dtype=np.uint8)
+    pattern = np.kron(np.indices((4, 4)).sum(axis=0) % 2, np.ones((size // 4, size // 4)))
+    pattern = np.repeat((pattern * 200 + 40).astype(np.uint8)[:, :, None], 3, axis=2)
+
+    backend = FakeBackend(conf)
+    pipeline = VisionPipeline(backend, config)
+    kills = 0
+    for i in range(int(seconds * fps)):
+        x, y = 100 + speed * i, 340
+        backend.box = (x, y, x + size, y + size)
+        result = pipeline.process(render(background, x, y, size, pattern), i / fps, True)
+        kills += result.lock_status == LOCK_KILL
+    return kills, backend.calls
+
+
+# detect-then-track + çoklu iz: takip edilen karelerde iz de ilerlemeli, yoksa yeniden tespit yeni ID açar ve kilit sıfırlanır
+def test_tracking_with_mot_locks_moving_target():
+    kills, calls = count_kills(PipelineConfig(tracking_enabled=True, mot_enabled=True))
+    reference, _ = count_kills(PipelineConfig(tracking_enabled=False, mot_enabled=True))
+    assert calls < 300 # takip gerçekten devrede
+    assert kills >= 2
+    assert kills == reference
+
+
+def test_tracking_keeps_track_id():
+    backend = FakeBackend()
+    pipeline = VisionPipeline(backend, PipelineConfig(tracking_enabled=True, mot_enabled=True))
+    background = np.zeros((720, 1280, 3), dtype=np.uint8)
+    pattern = np.kron(np.indices((4, 4)).sum(axis=0) % 2, np.full((10, 10), 220)).astype(np.uint8)[:, :, None].repeat(3, axis=2)
+    ids = set()
+    for i in range(120):
+        x = 100 + 3 * i
+        backend.box = (x, 340, x + 40, 380)
+        result = pipeline.process(render(background, x, 340, 40, pattern), i / 30.0, True)
+        if result.bbox is not None:
+            ids.add(result.track_id)
+    assert ids == {1}
+
+
+# sadece conf_threshold ile mot_high_conf arasında görülen hedef de iz açıp kilitlenebilmeli
+def test_low_confidence_target_locks():
+    config = PipelineConfig(tracking_enabled=False, mot_enabled=True)
+    assert config.conf_threshold < 0.3 < config.mot_high_conf
+    kills, _ = count_kills(config, conf=0.3)
+    reference, _ = count_kills(config)
+    assert kills >= 2
+    assert kills == reference